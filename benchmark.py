@@ -0,0 +1,223 @@
+import tkinter as tk, tkinter.font as tkf
+from boxselect   import BoxSelectText, BoxModel, align_cells, number_key, SHIFT, CONTROL, ALTSHIFT, BUTTON1
+from contextlib  import contextmanager
+from typing      import Iterable, Callable
+import argparse, json, os, random, shutil, subprocess, sys, time
+
+#line counts to measure, and operations per measurement
+LINES = (1_000, 10_000, 100_000, 1_000_000)
+OPS   = 20
+BOX   = 100     #rows in the box-selection
+COLS  = 8       #columns in the box-selection
+SEED  = 1       #synthetic documents are the same on every run
+DOCS  = ('ascii', 'tabs', 'wide', 'mixed')
+
+#building blocks for synthetic lines
+WORDS = ('alpha', 'beta', 'gamma', 'delta', 'x', 'yz', '0123', '=', '|')
+WIDE  = ('漢字', '日本語', 'テキスト', '한글')
+
+#DOCUMENTS
+#`lines` synthetic lines of `kind` ~ ascii words, words split by tabs, words mixed with wide text, or all of it
+def document(lines:int, kind:str='mixed', seed:int=SEED) -> str:
+    rnd  = random.Random(seed)
+    sep  = ('\t',' ') if kind in ('tabs','mixed') else (' ',)
+    pool = WORDS+WIDE if kind in ('wide','mixed') else WORDS
+    return '\n'.join(rnd.choice(sep).join(rnd.choices(pool, k=rnd.randint(2, 8))) for _ in range(lines))
+
+#EVENTS
+#fire an event at the widget and process it immediately
+def send(w:tk.Widget, evt:str, **kw) -> None:
+    w.event_generate(evt, when='now', **kw)
+
+#pixel position of the middle of (r)ow, (c)ol ~ the view is kept at the top-left
+def xy(w:BoxSelectText, r:int, c:int) -> dict:
+    f = tkf.Font(font=w['font'])
+    return dict(x=c*f.measure(' '), y=(r-1)*(fh:=f.metrics('linespace'))+fh//2)
+
+#press the Alt+Shift hotkey and LMB at (b)egin ~ (r)ow, (c)ol
+def box_press(w:BoxSelectText, b:tuple) -> None:
+    w.xview_moveto(0); w.yview_moveto(0)
+    w.caret = '{}.{}'.format(*b)
+    send(w, '<KeyPress>', keysym='Shift_L', state=0)
+    send(w, '<KeyPress>', keysym='Alt_L'  , state=SHIFT)
+    send(w, '<KeyPress>', keysym='Alt_L'  , state=ALTSHIFT|BUTTON1, **xy(w, *b))
+
+#the held hotkey keeps repeating with BUTTON1 in it's state ~ that is how the box end follows the mouse
+def box_move(w:BoxSelectText, e:tuple) -> None:
+    send(w, '<KeyPress>', keysym='Alt_L', state=ALTSHIFT|BUTTON1, **xy(w, *e))
+
+def box_release(w:BoxSelectText) -> None:
+    send(w, '<KeyRelease>', keysym='Alt_L'  , state=ALTSHIFT)
+    send(w, '<KeyRelease>', keysym='Shift_L', state=SHIFT)
+
+#Alt+Shift drag from (b)egin to (e)nd ~ a multiline-caret when both are in the same column
+def box_select(w:BoxSelectText, b:tuple, e:tuple) -> None:
+    box_press(w, b); box_move(w, e); box_release(w)
+
+def key(w:BoxSelectText, keysym:str, state:int=0) -> None:
+    send(w, '<KeyPress>', keysym=keysym, state=state)
+
+#grab the box-selection at (g) and drop it at (d) ~ (r)ow, (c)ol
+#the widget sees a motion before the text class binding moves the caret for it, so it takes two to start dragging
+def drag_drop(w:BoxSelectText, g:tuple, d:tuple) -> None:
+    send(w, '<Motion>'       , **xy(w, *g))
+    send(w, '<ButtonPress-1>', **xy(w, *g))
+    send(w, '<Motion>'       , state=BUTTON1, **xy(w, *d))
+    send(w, '<Motion>'       , state=BUTTON1, **xy(w, *d))
+    send(w, '<ButtonRelease-1>', state=BUTTON1, **xy(w, *d))
+
+#MEASURING
+#run `op(i)` `n` times ~ `setup(i)` runs before each one and isn't measured
+#ms, tcl calls and widget commands per op, every frame the op caused included
+def timed(w:BoxSelectText, op:Callable, n:int, setup:Callable=None) -> dict:
+    ms = calls = cmds = 0
+    for i in range(n):
+        if setup: setup(i); w.update()
+        w.stats.reset()
+        t = time.perf_counter()
+        op(i); w.update()
+        ms    += (time.perf_counter()-t)*1000
+        calls += sum(w.stats.ops.values())
+        cmds  += sum(w.stats.opcmds.values())
+    return {'ms_per_op': round(ms/n, 3), 'tcl_calls_per_op': round(calls/n, 1), 'commands_per_op': round(cmds/n, 1)}
+
+#every gesture against one document ~ in an order where each one leaves the widget ready for the next
+def scenarios(w:BoxSelectText, lines:int, n:int, box:int, cols:int) -> dict:
+    h, b = min(box, lines), (1, 2)
+    e    = (h, 2+cols)
+    out  = {}
+
+    #drag-select ~ one op is one mouse move that grows the box
+    box_press(w, b)
+    out['drag-select'] = timed(w, lambda i: box_move(w, (1+(h-1)*(i+1)//n, 2+cols*(i+1)//n)), n)
+    box_release(w)
+
+    out['copy']        = timed(w, lambda i: key(w, 'c', CONTROL), n)
+    #left and right in turns so the box stays where it is
+    out['shift-arrow'] = timed(w, lambda i: key(w, ('Right','Left')[i%2], SHIFT), n)
+    #upper and lower case in turns, so every op has something to replace
+    out['box-replace'] = timed(w, lambda i: w.box_replace('[a-z]' if i%2==0 else '[A-Z]', lambda m: m[0].swapcase()), n)
+    #every drop has to move the text, or what was measured is a deselect
+    rows = []
+    def grab(i:int) -> None:
+        rows.append(w.get('1.0', f'{h}.end'))
+        box_select(w, (1, 2+i%2), (h, 2+i%2+cols))
+    out['drag-drop']   = timed(w, lambda i: drag_drop(w, (1, 3+i%2), (1, 4-i%2)), n, grab)
+    rows.append(w.get('1.0', f'{h}.end'))
+    if any(a==b for a, b in zip(rows, rows[1:])): raise RuntimeError('drag-drop did not move the box-selection')
+
+    #multiline-caret
+    box_select(w, b, (h, b[1]))
+    out['type']        = timed(w, lambda i: key(w, 'x'), n)
+    out['backspace']   = timed(w, lambda i: key(w, 'BackSpace'), n)
+
+    #cut and paste the same box back
+    box  = lambda i: box_select(w, b, e)
+    out['cut']         = timed(w, lambda i: key(w, 'x', CONTROL), n, box)
+    out['paste']       = timed(w, lambda i: key(w, 'v', CONTROL), n, lambda i: (box(i), key(w, 'x', CONTROL)))
+
+    #a box-selection on every row of the box ~ they all type at once
+    for r in range(1, h+1): w.add_box(f'{r}.2', f'{r}.{2+cols}')
+    out['multi-type']  = timed(w, lambda i: key(w, 'x'), n)
+
+    #drop the box-selection before the next document
+    send(w, '<ButtonPress-1>', x=0, y=0)
+    send(w, '<ButtonRelease-1>', x=0, y=0)
+    return out
+
+def bench(lines:Iterable=LINES, docs:Iterable=('mixed',), n:int=OPS, box:int=BOX, cols:int=COLS) -> dict:
+    root = tk.Tk()
+    root.geometry('1024x768')
+    (w := BoxSelectText(root)).pack(fill='both', expand=True)
+    #frames go out as soon as they are asked for, so every op pays for it's own drawing
+    w.maxfps = 1_000_000
+    w.instrument()
+    root.update()
+    w.focus_force()
+
+    results = []
+    for kind in docs:
+        for l in lines:
+            w.text = document(l, kind)
+            w.update()
+            for op, r in scenarios(w, l, n, box, cols).items():
+                results.append({'doc':kind, 'lines':l, 'op':op, 'n':n, **r})
+
+    root.destroy()
+    return {'python': sys.version.split()[0], 'tk': tk.TkVersion, 'box': [box, cols], 'results': results}
+
+#HEADLESS
+#`op(i)` `n` times against the model alone ~ ms and script commands per op
+def modeled(op:Callable, n:int) -> dict:
+    ms = cmds = 0
+    for i in range(n):
+        t     = time.perf_counter()
+        cmds += len(op(i))
+        ms   += (time.perf_counter()-t)*1000
+    return {'ms_per_op': round(ms/n, 3), 'commands_per_op': round(cmds/n, 1)}
+    
+#the same gestures the widget gets, minus the widget ~ no display needed
+def headless(lines:Iterable=LINES, docs:Iterable=('mixed',), n:int=OPS, box:int=BOX, cols:int=COLS) -> dict:
+    results = []
+    for kind in docs:
+        for l in lines:
+            m    = BoxModel.from_text(document(l, kind))
+            h    = min(box, l)
+            mc   = BoxModel.bounds((1, 2), (h, 2))
+            bnd  = BoxModel.bounds((1, 2), (h, 2+cols))
+            clip = m.copy(bnd)
+            ops  = {'type'     : lambda i: m.type(mc, 'x')[0],
+                    'backspace': lambda i: m.backspace(mc)[0],
+                    #cut and paste the same box back
+                    'cut-paste': lambda i: m.cut(bnd)+m.paste(clip.rows if clip else [], (1, 2)),
+                    #right and left in turns so the box stays where it is
+                    'move'     : lambda i: m.move(BoxModel.bounds((1, 2+i%2), (h, 2+i%2+cols)), (1, 3-i%2))[0],
+                    #column transforms ~ up and down in turns, so every sort has rows to move
+                    'sort'     : lambda i: m.sort(bnd, number_key, i%2==1)[0],
+                    'align'    : lambda i: m.transform(bnd, align_cells, ' ')[0]}
+            for op, f in ops.items():
+                results.append({'doc':kind, 'lines':l, 'op':op, 'n':n, **modeled(f, n)})
+                
+    return {'python': sys.version.split()[0], 'box': [box, cols], 'headless': True, 'results': results}
+
+#DISPLAY
+#use the display there is, otherwise start a virtual X server for the run
+@contextmanager
+def display():
+    if os.environ.get('DISPLAY') or not (x:=shutil.which('Xvfb')):
+        yield
+        return
+    n = next(n for n in range(99, 199) if not os.path.exists(f'/tmp/.X11-unix/X{n}'))
+    p = subprocess.Popen((x, f':{n}', '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'),
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        #wait for the server socket
+        for _ in range(100):
+            if os.path.exists(f'/tmp/.X11-unix/X{n}'): break
+            time.sleep(0.05)
+        os.environ['DISPLAY'] = f':{n}'
+        yield
+    finally:
+        os.environ.pop('DISPLAY', None)
+        p.terminate(); p.wait()
+
+
+#ex: `python benchmark.py --lines 1000 100000 --docs tabs wide --out before.json`
+if __name__ == '__main__':
+    a = argparse.ArgumentParser(description='box-select benchmarks ~ ms, tcl calls and widget commands per op, as json')
+    a.add_argument('--lines', type=int, nargs='+', default=LINES       , help='document sizes')
+    a.add_argument('--docs' , nargs='+', choices=DOCS, default=['mixed'], help='document kinds')
+    a.add_argument('--ops'  , type=int, default=OPS , help='operations per measurement')
+    a.add_argument('--box'  , type=int, default=BOX , help='rows in the box-selection')
+    a.add_argument('--cols' , type=int, default=COLS, help='columns in the box-selection')
+    a.add_argument('--out'  , help='write the results here instead of stdout')
+    a.add_argument('--headless', action='store_true', help='measure the model alone, without a widget or display')
+    a = a.parse_args()
+
+    if a.headless: r = headless(a.lines, a.docs, a.ops, a.box, a.cols)
+    else:
+        with display(): r = bench(a.lines, a.docs, a.ops, a.box, a.cols)
+
+    if a.out:
+        with open(a.out, 'w') as f: json.dump(r, f, indent=2)
+    else: print(json.dumps(r, indent=2))
@@ -1,8 +1,13 @@
 import tkinter as tk, tkinter.font as tkf
-from collections import namedtuple
-from typing      import Iterable, Any
+from collections import namedtuple, deque
+from typing      import Iterable, Callable, Any, Union
 from dataclasses import dataclass, asdict
-import math, re, tempfile, os
+from functools   import lru_cache
+from array       import array
+from bisect      import bisect_left, bisect_right
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from unicodedata import east_asian_width
+import codecs, itertools, math, mmap, os, re, time
 
 #event.state flags
 SHIFT    = 0x000001
@@ -12,23 +17,66 @@ ALT      = 0x020000
 ARROWKEY = 0x040000
 ALTSHIFT = ALT|SHIFT
 
+#render flags
+R_BOX    = 0x01 #box end moved
+R_LINE   = 0x02 #caret changed lines
+R_VIEW   = 0x04 #overlay has to follow the view
+R_MOVE   = 0x08 #Shift+Arrow moved the box-selection
+
 #swatches
 BG       = '#181818' #text background
 ACT_BG   = '#1f1f28' #active line background
 FG       = '#CFCFEF' #all foregrounds and caret color
 SEL_BG   = '#2f2f3f' #select background
 SDW_CT   = '#686898' #shadow caret color
+MATCH_BG = '#3f3f2f' #current box_find match background
 
 #vars
 INSWIDTH = 1                      #caret width
 INSPNT   = 'insertpoint'          #drop insertion point
 ILWHITE  = re.compile(r'[ \t]+')  #inline whitespace regex
-WHITE    = re.compile(r'\s+')     #all whitespace regex
+BATCH    = 'textra_batch'         #tcl proc that runs a list of widget commands in one call
+CARETMOVE= ('insert','delete','replace','see','xview','yview','edit') #commands that can move faux-carets
+LAYOUT   = (*CARETMOVE,'configure','image','window') #commands that can move line geometry ~ so can `tag configure`
+VMARGIN  = 10                     #rows drawn above and below the view for box-selections
+MAXFPS   = 60                     #default frame rate cap for box-select rendering
+FILECHUNK= 1<<20                  #bytes per chunk when loading a file
+SAVEROWS = 10000                  #rows per region when saving a file
+PIECEBLOCK = 1<<20                #bytes per block of a piece table's file ~ line breaks are counted per block
+PIECECHUNK = 10000                #rows per piece when a piece table's box is replaced
+WINDOWROWS = 5000                 #rows of a piece table shown in the widget at a time
+WINDOWEDGE = 0.1                  #the window slides when the view is this close to one of it's edges
+CHUNKMS  = 25                     #default time budget of one chunk of a long box edit
+CHUNKROWS= 5000                   #default rows per chunk ~ box edits over more rows than this run in chunks
+XFORMMS  = 10                     #ms between checks on a column transform running in a pool
+TABS     = 4                      #display columns per tab stop
+EDITS    = ('insert','delete','replace') #commands that change text
+ROWCOL   = re.compile(r'(\d+)\.(\d+|end)$') #literal 'row.col' or 'row.end' index
+UNKNOWN  = 0xFFFFFFFF             #line length that hasn't been asked for yet
+STATSAMPLES = 1024                #latencies kept per command for percentiles
+SUBCMDS  = ('tag','mark','edit')  #commands that are counted with their subcommand
+
+#instrumented operations ~ every proxied tcl call is counted against the one in progress
+OP_EVENT = 'event'
+OP_BOX   = 'box draw'
+OP_LINE  = 'active line'
+OP_VIEW  = 'caret draw'
+OP_TYPE  = 'type'
+OP_CLIP  = 'cut/copy'
+OP_PASTE = 'paste'
+OP_MOVE  = 'move'
+OP_DROP  = 'drag-drop'
+OP_BLINK = 'blink'
+OP_CLEAN = 'clean'
+OP_FIND  = 'find/replace'
+OP_XFORM = 'transform'
 
 #arrows ~ for various key conditions
 HARROWS  = ('Left','Right','KP_Left','KP_Right')
 VARROWS  = ('Up'  ,'Down' ,'KP_Up'  ,'KP_Down' )
 ARROWS   = HARROWS+VARROWS
+ARROWSTEP= {'Down':( 1,0),'Right':(0, 1),
+            'Up'  :(-1,0),'Left' :(0,-1)} #(row, col) step of each arrow
 
 #alts and shifts vor various key conditions
 ALTS     = ('Alt_L'  , 'Alt_R'  )
@@ -55,6 +103,47 @@ class Text_t:
     maxundo         :int  = 1000 #-1 for infinite
 
 
+#DISPLAY COLUMNS
+#map of a line's character columns to display columns ~ tabs stop every `TABS` columns, wide characters take 2
+def column_map(t:str) -> Any:
+    #a plain line maps 1:1 ~ keep the length only
+    if t.isascii() and not ('\t' in t): return len(t)
+    m, d = array('I', (0,)), 0
+    for ch in t:
+        d = (d//TABS+1)*TABS if ch=='\t' else d+(1,2)[east_asian_width(ch) in ('W','F')]
+        m.append(d)
+    return m
+    
+#display column of character column `c` in column map `m` ~ columns past the end of the line are virtual and 1 wide
+def display_col(m:Any, c:int) -> int:
+    if isinstance(m, int): return c
+    n = len(m)-1
+    return m[c] if c<=n else m[n]+c-n
+    
+#character column at display column `d` in column map `m` ~ `up` rounds a column inside a tab or wide character to the next character
+def char_col(m:Any, d:int, up:bool=False) -> int:
+    if isinstance(m, int): return d
+    n = len(m)-1
+    if d>=m[n]: return n+d-m[n]
+    c = bisect_right(m, d)-1
+    return c+(up and m[c]<d)
+    
+#(s) with (t)ext put in at display column (pc) ~ (s) is padded out to the column when it's shorter
+def paste_col(s:str, t:str, pc:int) -> str:
+    #nothing to pad for no text
+    if not t: return s
+    m = column_map(s)
+    #add enough space to keep us in line
+    if pc >= (w:=display_col(m, len(s))): return f'{s}{" "*(pc-w)}{t}'
+    #insert (t)ext at the character under the display column
+    return f'{s[:(x:=char_col(m, pc))]}{t}{s[x:]}'
+    
+#(t) without the whitespace a box edit left behind ~ a row of only whitespace is emptied, any other loses it's trailing whitespace past column (c)
+def clean_row(t:str, c:int) -> str:
+    if not len(ILWHITE.sub('', t)): return ''
+    return t[:c+len(s)] if len(s:=t[c:].rstrip()) < len(t[c:]) else t
+
+
 #this adds some extra generic behavior to tk.Text, and automates it's config to our purposes
 #it's turned into it's own thing so we can get generic scripts out of the box-select code
 class Textra(tk.Text): 
@@ -69,8 +158,29 @@ class Textra(tk.Text):
     @property
     def text(self) -> str: return self.get('1.0', f'{tk.END}-1c')
 
+    #the whole text is replaced without recording it for undo ~ the history is reset instead
     @text.setter
-    def text(self, text:str) -> None: self.delete('1.0', tk.END); self.insert('1.0', text) 
+    def text(self, text:str) -> None: 
+        if r:=self.recording: self.__recording(False)
+        self.delete('1.0', tk.END)
+        self.insert('1.0', text)
+        if r: self.__recording(True)
+        
+    #UNDO
+    #edits are being recorded for undo ~ a subclass that keeps it's own history skips edits while they aren't
+    @property
+    def recording(self) -> bool: return self.__undo is None
+    
+    #stop, or go back to, recording edits for undo ~ going back resets the history, it doesn't match the text anymore
+    def __recording(self, on:bool) -> None:
+        if on == self.recording: return
+        if on:
+            if self.__undo: self['undo'] = True
+            self.__undo = None
+            self.edit_reset()
+            return
+        if (u:=bool(int(self['undo']))): self['undo'] = False
+        self.__undo = u
       
     #replace text
     def replace_text(self, b:str, e:str, text:str) -> None:
@@ -81,10 +191,224 @@ class Textra(tk.Text):
     def append_text(self, text:str) -> None:
         self.insert(f'{tk.END}-1c', text)
         
-    #LINE
+    #FILES
+    #replace the text with file `path`, streamed from a memory map `chunk` bytes at a time ~ chunks end on a line break when they can
+    #the rest of the file follows between events, `done()` is called once it is all in. `wait` loads it all before returning
+    #nothing is recorded for undo until the load is over, then the history is reset
+    def load_file(self, path:str, encoding:str='utf-8', chunk:int=FILECHUNK, done:Callable=None, wait:bool=False) -> None:
+        self.__loadcancel()
+        self.__recording(False)
+        self.delete('1.0', tk.END)
+        with open(path, 'rb') as f:
+            #an empty file can't be mapped
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+        self.__load = [m, 0, codecs.getincrementaldecoder(encoding)(errors='replace'), max(1, chunk), done]
+        while self.__loadstep() and wait: pass
+        
+    @property
+    def loading(self) -> bool: return self.__load is not None
+    
+    #append the next chunk ~ returns True if there is more to come
+    def __loadstep(self) -> bool:
+        self.__loadid = None
+        m, i, dec, chunk, done = self.__load
+        if m and i<len(m):
+            e = len(m) if i+chunk>=len(m) else (m.rfind(b'\n', i, i+chunk)+1 or i+chunk)
+            self.insert('end-1c', dec.decode(m[i:e], e==len(m)).replace('\r\n', '\n'))
+            self.__load[1] = e
+            if e<len(m):
+                self.__loadid = self.after(1, self.__loadstep)
+                return True
+        #all in ~ undo history starts here
+        self.__loadcancel()
+        self.edit_modified(False)
+        if done: done()
+        return False
+        
+    def __loadcancel(self) -> None:
+        if not (self.__loadid is None): self.after_cancel(self.__loadid)
+        if self.__load and self.__load[0]: self.__load[0].close()
+        if self.__load: self.__recording(True)
+        self.__load = self.__loadid = None
+        
+    #write the text to file `path`, `rows` rows at a time ~ the whole text is never one string
+    def save_file(self, path:str, encoding:str='utf-8', rows:int=SAVEROWS) -> None:
+        n = int(self.index('end-1c').split('.')[0])
+        with open(path, 'w', encoding=encoding, newline='\n') as f:
+            for r in range(1, n+1, rows):
+                e = min(n, r+rows-1)
+                f.write(self.get(f'{r}.0', f'{e}.end'))
+                if e<n: f.write('\n')
+        
+    #BATCH
+    #run many `(cmd, *args)` commands on widget command `w` in one tcl round-trip ~ returns every result
+    #`w=''` runs them as plain tcl commands. a failing command yields '' instead of aborting the rest of the batch
+    def batch(self, cmds:Iterable, w:str=None) -> tuple:
+        if not (cmds:=tuple(cmds)): return ()
+        return self.tk.splitlist(self.tk.call(BATCH, self._w if w is None else w, cmds))
+        
+    #LINE INDEX
+    #per-row lengths and display-column maps, kept current by `watch` ~ which has to see every edit before it runs
+    #lengths are asked for in bulk as they are needed, maps are built from the text
+    #line lengths ~ built on first use
+    def __lines(self) -> array:
+        if self.__lens is None:
+            n = int(str(self.tk.call(self._orig, 'index', 'end-1c')).split('.')[0])
+            self.__lens, self.__dmaps = array('I', (UNKNOWN,))*n, [None]*n
+        return self.__lens
+        
+    @property
+    def line_count(self) -> int: return len(self.__lines())
+    
+    #length of every row in `rows` ~ unknown lengths are asked for in one round-trip, rows past the end are empty
+    def line_lengths(self, rows:range) -> array:
+        ln = self.__lines()
+        b, e = max(1, rows.start), max(1, min(len(ln)+1, rows.stop))
+        if UNKNOWN in (a:=ln[b-1:e-1]):
+            need = [r for r, n in enumerate(a, b) if n==UNKNOWN]
+            for r, i in zip(need, self.batch((('index', f'{r}.end') for r in need), self._orig)):
+                ln[r-1] = int(i.split('.')[1])
+            a = ln[b-1:e-1]
+        return a + array('I', (0,))*(len(rows)-len(a))
+        
+    def line_length(self, r:int) -> int: return self.line_lengths(range(r, r+1))[0]
+        
+    #build any missing display-column maps for `rows` in one round-trip
+    def prime_dcols(self, rows:range) -> list:
+        ln, m = self.__lines(), self.__dmaps
+        if (need:=[r for r in range(max(1, rows.start), min(len(m), rows.stop-1)+1) if m[r-1] is None]):
+            for r,t in zip(need, self.batch((('get', f'{r}.0', f'{r}.end') for r in need), self._orig)):
+                m[r-1], ln[r-1] = column_map(t), len(t)
+        return m
+        
+    def __dline(self, r:int) -> Any:
+        m = self.prime_dcols(range(r, r+1))
+        return m[r-1] if 0<r<=len(m) else 0
+        
+    #display column of character column `c` in row `r`
+    def dcol(self, r:int, c:int) -> int: return display_col(self.__dline(r), c)
+        
+    #character column at display column `d` in row `r`
+    def ccol(self, r:int, d:int, up:bool=False) -> int: return char_col(self.__dline(r), d, up)
+        
+    #drop the whole index ~ it is rebuilt on demand
+    def forget_lines(self) -> None:
+        self.__lens = self.__dmaps = None
+        
+    #rows where the index disagrees with the widget ~ empty when it is consistent
+    def check_lines(self) -> list:
+        if self.__lens is None: return []
+        ln, m = self.__lens, self.__dmaps
+        n   = int(str(self.tk.call(self._orig, 'index', 'end-1c')).split('.')[0])
+        bad = [*range(min(n, len(ln))+1, max(n, len(ln))+1)]
+        for r,t in zip(range(1, min(n, len(ln))+1), self.batch((('get', f'{r}.0', f'{r}.end') for r in range(1, n+1)), self._orig)):
+            if ((ln[r-1]!=UNKNOWN) and (ln[r-1]!=len(t))) or ((m[r-1] is not None) and (m[r-1]!=column_map(t))): bad.append(r)
+        return sorted(bad)
+        
+    #(row, col) of index `i` before an edit runs ~ literal indexes are resolved without asking tk
+    def __rc(self, i:Any) -> tuple:
+        ln = self.__lens
+        if x:=ROWCOL.match(i:=str(i)):
+            r = min(max(int(x.group(1)), 1), len(ln)+1)
+            #past the last row is the end of the last row
+            if r>len(ln): return len(ln), ln[-1]
+            if x.group(2)!='end': return r, min(int(x.group(2)), ln[r-1])
+            if ln[r-1]!=UNKNOWN : return r, ln[r-1]
+        r, c = map(int, str(self.tk.call(self._orig, 'index', i)).split('.'))
+        return (len(ln), ln[-1]) if r>len(ln) else (r, c)
+        
+    #`t`ext was inserted at `r`ow, `c`ol
+    def __linsert(self, r:int, c:int, t:str) -> None:
+        ln, m = self.__lens, self.__dmaps
+        if len(s:=t.split('\n'))==1:
+            if ln[r-1]!=UNKNOWN: ln[r-1] += len(t)
+            m[r-1] = None
+            return
+        #the row is split around the new rows
+        b, e = (c+len(s[0]), len(s[-1])+ln[r-1]-c) if ln[r-1]!=UNKNOWN else (UNKNOWN, UNKNOWN)
+        ln[r-1:r] = array('I', (b, *map(len, s[1:-1]), e))
+        m[r-1:r]  = [None]*len(s)
+        
+    #text from `b` to `e` was deleted
+    def __ldelete(self, b:tuple, e:tuple) -> None:
+        if e<=b: return
+        ln, m = self.__lens, self.__dmaps
+        (br,bc), (er,ec) = b, e
+        ln[br-1:er] = array('I', (bc+ln[er-1]-ec if UNKNOWN!=ln[br-1] and UNKNOWN!=ln[er-1] else UNKNOWN,))
+        m[br-1:er]  = [None]
+        
+    #feed every widget command here before it runs
+    def watch(self, cmd:str, args:tuple) -> None:
+        if (self.__geo is not None) and ((cmd in LAYOUT) or ((cmd=='tag') and args and (args[0]=='configure'))): self.forget_geometry()
+        if self.__lens is None: return
+        if cmd=='edit':
+            #undo and redo can touch anything
+            if args and (args[0] in ('undo','redo')): self.forget_lines()
+            return
+        if not (cmd in EDITS): return
+        try:
+            if cmd=='insert':
+                self.__linsert(*self.__rc(args[0]), ''.join(map(str, args[1::2])))
+                return
+            i = args if cmd=='delete' else args[:2]
+            if len(i)%2: i = (*i, f'{i[-1]}+1c')
+            #tk deletes ranges from the last to the first
+            rs = sorted(((self.__rc(i[n]), self.__rc(i[n+1])) for n in range(0, len(i), 2)), reverse=True)
+            for b,e in rs: self.__ldelete(b, e)
+            #replace inserts where it's range began, as it was before the delete
+            if cmd=='replace': self.__linsert(*rs[0][0], ''.join(map(str, args[2::2])))
+        except Exception:
+            self.forget_lines()
+        
+    def destroy(self) -> None:
+        self.__loadcancel()
+        self.forget_geometry()
+        tk.Text.destroy(self)
+        #the proxy isn't one of tkinter's own commands, so it isn't dropped with the widget
+        self.tk.deletecommand(self._w)
+        
+    #LINE GEOMETRY
+    #lines are laid out at most once a frame ~ what is asked about is kept until the next idle, or until `watch` sees something that can move lines
+    def __layout(self) -> dict:
+        if self.__geo is None:
+            self.update_idletasks()
+            self.__geo, self.__bbox, self.__vis = {}, {}, None
+            self.__wrap  = self['wrap'] != 'none'
+            self.__geoid = self.after_idle(self.forget_geometry)
+        return self.__geo
+        
+    def forget_geometry(self) -> None:
+        if not (self.__geoid is None): self.after_cancel(self.__geoid)
+        self.__geo = self.__geoid = None
+        
+    #(row, x, y, width, height, baseline) of every row on screen ~ in one call. a wrapped row is it's first display line
+    def visible_lines_info(self) -> list:
+        g = self.__layout()
+        if self.__vis is None:
+            t, b = (int(str(i).split('.')[0]) for i in self.batch((('index', '@0,0'), ('index', f'@0,{self.winfo_height()}'))))
+            rows = range(t, b+1)
+            for r, i in zip(rows, self.batch((('dlineinfo', f'{r}.0') for r in rows))):
+                g[r] = tuple(map(int, self.tk.splitlist(i))) if i else None
+            self.__vis = [(r, *g[r]) for r in rows if g[r]]
+        return self.__vis
+        
     def dlineinfo(self, index=tk.INSERT) -> tuple:
-        self.update_idletasks()
+        g = self.__layout()
+        #unwrapped, every index of a row is on the same display line
+        if not self.__wrap and (x:=ROWCOL.match(str(index))):
+            if not ((r:=int(x.group(1))) in g): g[r] = None if (self.__vis is not None) else super().dlineinfo(f'{r}.0')
+            return g[r]
         return super().dlineinfo(index)
+        
+    #bbox of every index in one call ~ literal 'row.col' indexes are kept with the rest of the geometry
+    def bboxes(self, indexes:Iterable) -> list:
+        self.__layout()
+        ix, c, got = [str(i) for i in indexes], self.__bbox, {}
+        if need:=[i for i in dict.fromkeys(ix) if not (i in c)]:
+            for i, b in zip(need, self.batch((('bbox', i) for i in need))):
+                got[i] = tuple(map(int, self.tk.splitlist(b))) if b else None
+            c.update((i, v) for i, v in got.items() if ROWCOL.match(i))
+        return [c[i] if i in c else got[i] for i in ix]
        
     #TAGS
     # No exception .start, .end
@@ -93,36 +417,528 @@ class Textra(tk.Text):
             return map(str,(tr[0],tr[-1]))
         return None, None
        
-    #replace all instances of `tag_in` with `tag_out`
+    #flat (i1, j1, i2, j2, ...) indexes from flat indexes or (begin, end) pairs
+    @staticmethod
+    def __flat(ranges:Iterable) -> tuple:
+        return tuple(i for x in ranges for i in (x if isinstance(x, (list,tuple)) else (x,)))
+        
+    #tag every range in one call ~ `ranges` are flat indexes or (begin, end) pairs
+    def tag_add_ranges(self, tag:str, ranges:Iterable) -> None:
+        if r:=self.__flat(ranges): self.tag_add(tag, *r)
+        
+    #untag every range in one call
+    def tag_remove_ranges(self, tag:str, ranges:Iterable) -> None:
+        if r:=self.__flat(ranges): self.tag_remove(tag, *r)
+        
+    #replace all instances of `tag_in` with `tag_out` ~ one call to find them, one to swap them
     def tag_replace(self, tag_in:str, tag_out:str) -> None:
-        r = self.tag_ranges(tag_in)
-        #swap the tags
-        for i in range(0, len(r), 2):
-            self.tag_remove(tag_in , *r[i:i+2])
-            self.tag_add   (tag_out, *r[i:i+2])
+        if r:=tuple(map(str, self.tag_ranges(tag_in))):
+            self.batch((('tag', 'remove', tag_in, '1.0', 'end'), ('tag', 'add', tag_out, *r)))
            
-    #move all instances of a tag to a new location
+    #move all instances of a tag to a new location ~ in one call
     #acts as `tag_remove()` when `b` and/or `e` are None
     def tag_move(self, tag:str, b:Iterable=None, e:Iterable=None) -> None:
-        x, y = self.tag_bounds(tag)
-        
-        if x and y: self.tag_remove(tag, x, y)
-        
+        cmds = [('tag', 'remove', tag, '1.0', 'end')]
         if b and e:
             x = b if isinstance(b, (list,tuple)) else (b,)
             y = e if isinstance(e, (list,tuple)) else (e,)
-            for b, e in zip(x,y):
-                self.tag_add(tag, b, e)
+            if r:=tuple(i for b, e in zip(x,y) for i in (b, e)): cmds.append(('tag', 'add', tag, *r))
+        self.batch(cmds)
+        
+    #make (tag) cover exactly `ranges` ~ only the ranges that differ from what is tagged now are removed or added
+    #the ranges are resolved, merged and compared to the tag's ranges in one call, and changed in another
+    def tag_set(self, tag:str, ranges:Iterable) -> None:
+        r    = self.__flat(ranges)
+        ix   = list(self.batch((*(('index', i) for i in r), ('tag', 'ranges', tag))))
+        have = self.tk.splitlist(ix.pop())
+        pos  = lambda i: tuple(map(int, str(i).split('.')))
+        
+        #wanted ranges in order, with the ones that touch or overlap merged ~ like tk keeps them
+        want = []
+        for b, e in sorted((pos(ix[n]), pos(ix[n+1])) for n in range(0, len(ix), 2)):
+            if b>=e: continue
+            if want and b<=want[-1][1]: want[-1][1] = max(want[-1][1], e)
+            else                      : want.append([b, e])
+        want = {(f'{b[0]}.{b[1]}', f'{e[0]}.{e[1]}') for b, e in want}
+        have = {(str(have[n]), str(have[n+1])) for n in range(0, len(have), 2)}
+        
+        cmds = []
+        if rem:=have-want: cmds.append(('tag', 'remove', tag, *(i for x in rem for i in x)))
+        if add:=want-have: cmds.append(('tag', 'add'   , tag, *(i for x in add for i in x)))
+        self.batch(cmds)
     
     #CONSTRUCTOR
     def __init__(self, master, *args, **kwargs):
         tk.Text.__init__(self, master, *args, **{**asdict(Text_t()), **kwargs})
+        self.__lens   = None #line lengths, one per row
+        self.__dmaps  = None #display-column maps, one per row
+        self.__load   = None #[map, offset, decoder, chunk size, done] of a file being loaded
+        self.__loadid = None #next chunk of the file
+        self.__geo    = None #row: dlineinfo of the rows asked about this frame ~ None until they are laid out
+        self.__geoid  = None #forgets the geometry at the next idle
+        self.__bbox   = {}   #index: bbox of the indexes asked about this frame
+        self.__vis    = None #visible_lines_info of this frame
+        self.__wrap   = False #rows wrap ~ their indexes aren't all on one display line
+        self.__undo   = None #tk's own undo setting while edits aren't recorded ~ None while they are
+        #(re)define the batch runner for this interpreter
+        self.tk.eval(f'proc {BATCH} {{w cmds}} {{set r {{}}; foreach c $cmds {{if {{[catch {{{{*}}$w {{*}}$c}} x]}} {{set x {{}}}}; lappend r $x}}; return $r}}')
+        
+        #hijack the widget command so `watch` sees every command, the ones from bindings included ~ `_orig` is the real widget command
+        #a subclass can put it's own proxy in place of this one, it has to call `watch` before every command it passes on
+        self._orig = self._w + "_orig"
+        self.tk.call("rename", self._w, self._orig)
+        self.tk.createcommand(self._w, self.__proxy)
+        
+    #PROXY
+    def __proxy(self, cmd, *args) -> Any:
+        self.watch(cmd, args)
+        try: return self.tk.call((self._orig, cmd) + args)
+        except Exception:
+            if cmd in EDITS: self.forget_lines()
+            raise
+
+
+#FONT METRICS
+#(space width, linespace) of `font` ~ shared by every widget in the process
+@lru_cache(maxsize=64)
+def font_metrics(master:tk.Misc, font:Any) -> tuple:
+    f = tkf.Font(root=master, font=font)
+    return f.measure(' '), f.metrics('linespace')
+
+
+#FAUX-CARET BITMAPS
+#process-wide, reference counted faux-caret images ~ widgets with the same interpreter, height and colors share them
+class CaretBitmaps:
+    __cache = {} #(interpreter, height, colors) -> [images, references]
+    
+    #in-memory xbm data for a caret (h)eight pixels tall
+    @staticmethod
+    def xbm(h:int) -> str:
+        #create prettyprint xbm data
+        xbmdata = ',\n\t'.join(','.join('0xFF' for _ in range(min(8, h-(8*i)))) for i in range(math.ceil(h/8)))
+        return (f"#define image_width {INSWIDTH}\n#define image_height {h}\n"
+                "static unsigned char image_bits[] = {\n\t"
+                f'{xbmdata}}};')
+    
+    #one image per (foreground, background) in (colors), for (master)'s interpreter ~ shared images are never recolored
+    @classmethod
+    def acquire(cls, master:tk.Misc, h:int, colors:tuple) -> tuple:
+        if not (c:=cls.__cache.get(k:=(master.tk, h, colors))):
+            data = cls.xbm(h)
+            c = cls.__cache[k] = [tuple(tk.BitmapImage(master=master, data=data, foreground=fg, background=bg) for fg, bg in colors), 0]
+        c[1] += 1
+        return c[0]
+    
+    #the last widget to release an entry deletes it's images
+    @classmethod
+    def release(cls, master:tk.Misc, h:int, colors:tuple) -> None:
+        if c:=cls.__cache.get(k:=(master.tk, h, colors)):
+            c[1] -= 1
+            if not c[1]: del cls.__cache[k]
+
+
+#PROXY STATS
+#what the widget proxy saw ~ calls, swallowed errors and latency per command, tcl calls and widget commands per operation
+class ProxyStats:
+    def __init__(self, samples:int=STATSAMPLES, callback:Callable=None):
+        self.samples  = samples  #latencies kept per command
+        self.callback = callback #called with (op, cmd, seconds) for every call
+        self.reset()
+        
+    def reset(self) -> None:
+        self.calls  = {} #cmd: calls
+        self.errors = {} #cmd: swallowed exceptions
+        self.total  = {} #cmd: cumulative seconds
+        self.ops    = {} #op: tcl calls
+        self.opcmds = {} #op: widget commands ~ a batch is 1 tcl call, but many commands
+        self.__lat  = {} #cmd: latest latencies
+        
+    #`n` widget commands went out in one tcl call that took `dt` seconds
+    def record(self, cmd:str, dt:float, op:str=None, n:int=1, err:bool=False) -> None:
+        self.calls[cmd]  = self.calls.get(cmd, 0)+1
+        self.total[cmd]  = self.total.get(cmd, 0.0)+dt
+        self.ops[op]     = self.ops.get(op, 0)+1
+        self.opcmds[op]  = self.opcmds.get(op, 0)+n
+        if err: self.errors[cmd] = self.errors.get(cmd, 0)+1
+        if (q:=self.__lat.get(cmd)) is None: q = self.__lat[cmd] = deque(maxlen=self.samples)
+        q.append(dt)
+        if self.callback: self.callback(op, cmd, dt)
+        
+    #`p`th percentile latency of `cmd` in seconds, over the latest samples
+    def percentile(self, cmd:str, p:float) -> float:
+        if not (q:=sorted(self.__lat.get(cmd, ()))): return 0.0
+        return q[min(len(q)-1, int(len(q)*p/100))]
+        
+    #everything as plain data ~ milliseconds
+    def summary(self) -> dict:
+        return {'commands': {cmd: {'calls'   : n, 
+                                   'errors'  : self.errors.get(cmd, 0),
+                                   'total_ms': self.total[cmd]*1000,
+                                   'p50_ms'  : self.percentile(cmd, 50)*1000,
+                                   'p95_ms'  : self.percentile(cmd, 95)*1000,
+                                   'p99_ms'  : self.percentile(cmd, 99)*1000} for cmd, n in self.calls.items()},
+                'ops'     : {op: {'tcl_calls': n, 'commands': self.opcmds[op]} for op, n in self.ops.items()}}
+
+
+#length of the prefix strings (a) and (b) have in common
+def common_prefix(a:str, b:str) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo<hi:
+        if a[:(m:=(lo+hi+1)//2)]==b[:m]: lo = m
+        else                           : hi = m-1
+    return lo
+    
+#what changed from (o)ld to (t)ext ~ (column, old part, new part), the parts both sides have in common are left out
+def row_diff(o:str, t:str) -> tuple:
+    p = common_prefix(o, t)
+    x = common_prefix(o[:p-1:-1], t[:p-1:-1]) if p else common_prefix(o[::-1], t[::-1])
+    return p, o[p:len(o)-x], t[p:len(t)-x]
+
+
+#a box edit as an undo record ~ each row of `rows` had `old` replaced with `new` at column `col`
+#`col`, `old` and `new` are one value for all rows, or one per row. `col=None` means the whole rows `old` became the whole rows `new`
+BoxRecord = namedtuple('BoxRecord', 'rows col old new')
+
+
+#rows of copied text, with the width and height of the selection they came from ~ kept by the widget, not the clipboard
+BoxClip = namedtuple('BoxClip', 'rows w h')
 
 
 #backbone of the entire operation
 #begin col/row, end col/row, (width or len), height, down, right
 SelectBounds = namedtuple('SelectBounds', 'bc br ec er w h dn rt')
+
+
+#BOX INDEX
+#disjoint box-selections in order of their first row, with the furthest last row reached up to each one
+#the boxes on a row are found by bisection, then walking back only while that reach still gets to the row
+class BoxIndex:
+    def __init__(self, boxes:Iterable=()):
+        self.__boxes = sorted(boxes, key=lambda b: (b.br, b.bc))
+        self.__brs, self.__reach = array('Q'), array('Q')
+        self.__reindex()
+        
+    #first rows, and reach, from box (i) on
+    def __reindex(self, i:int=0) -> None:
+        del self.__brs[i:], self.__reach[i:]
+        r = self.__reach[i-1] if i else 0
+        for b in self.__boxes[i:]:
+            self.__brs.append(b.br)
+            self.__reach.append(r:=max(r, b.er))
+        
+    def __len__(self) -> int: return len(self.__boxes)
+    
+    def __iter__(self): return iter(self.__boxes)
+    
+    #first row of the first box, last row of the lowest box
+    @property
+    def span(self) -> tuple: return (self.__brs[0], self.__reach[-1]) if self.__boxes else None
     
+    #after the boxes on the same first row that start left of it
+    def add(self, bnd:SelectBounds) -> None:
+        i, n = bisect_left(self.__brs, bnd.br), len(self.__boxes)
+        while (i<n) and (self.__boxes[i].br==bnd.br) and (self.__boxes[i].bc<=bnd.bc): i += 1
+        self.__boxes.insert(i, bnd)
+        self.__reindex(i)
+        
+    def remove(self, bnd:SelectBounds) -> None:
+        i = self.__boxes.index(bnd, bisect_left(self.__brs, bnd.br))
+        del self.__boxes[i]
+        self.__reindex(i)
+        
+    def clear(self) -> None:
+        self.__boxes = []
+        self.__reindex()
+        
+    #boxes that have any row from (b) to (e)
+    def within(self, b:int, e:int) -> list:
+        out, i = [], bisect_right(self.__brs, e)-1
+        while i>=0 and self.__reach[i]>=b:
+            if self.__boxes[i].er>=b: out.append(self.__boxes[i])
+            i -= 1
+        return out[::-1]
+        
+    #box with (r)ow, (c)ol in it
+    def at(self, r:int, c:int) -> SelectBounds:
+        return next((b for b in self.within(r, r) if b.bc<=c<b.ec), None)
+        
+    #boxes that share any row and column with (bnd)
+    def overlaps(self, bnd:SelectBounds) -> list:
+        return [b for b in self.within(bnd.br, bnd.er) if (b.bc<bnd.ec and bnd.bc<b.ec) or (b.bc==bnd.bc==b.ec==bnd.ec)]
+    
+
+#COLUMN TRANSFORMS
+#the cells of a box-selection in, as many cells out ~ they are module-level so a process pool can run them too
+
+#'upper', 'lower', 'title', 'capitalize' or 'swapcase' every cell
+def case_cells(cells:list, how:str='upper') -> list: return list(map(getattr(str, how), cells))
+
+#pad every cell so the first (delim)iter in each lines up ~ cells without one are left as they are
+def align_cells(cells:list, delim:str=',') -> list:
+    parts = [(a.rstrip(), d, z) for a, d, z in (c.partition(delim) for c in cells)]
+    w     = {a:display_col(column_map(a), len(a)) for a, d, _ in parts if d}
+    m     = max(w.values(), default=0)
+    return [f'{a}{" "*(m-w[a])}{d}{z}' if d else c for (a, d, z), c in zip(parts, cells)]
+    
+#(t)ext as a number, or None ~ thousands separators are allowed
+def cell_number(t:str) -> Any:
+    t = t.strip().replace(',', '')
+    try   : return int(t)
+    except ValueError: pass
+    try   : return float(t)
+    except ValueError: return None
+    
+#format every cell that is a number with format (spec) ~ ex: '>10.2f', ',d'. anything else is left as it is
+def number_cells(cells:list, spec:str='') -> list:
+    out = []
+    for c in cells:
+        try   : out.append(c if (n:=cell_number(c)) is None else format(n, spec))
+        except ValueError: out.append(c)
+    return out
+    
+#sort key that puts numbers first, in numeric order, and everything else after them
+def number_key(t:str) -> tuple: return (1, 0, t) if (n:=cell_number(t)) is None else (0, n, '')
+
+
+#BOX MODEL
+#box-select without a widget ~ rectangular edits of rows of text kept in memory. every edit returns the edit script that does the same to a text widget
+#scripts are widget commands, ('replace', i, j, text), ('insert', i, text) or ('delete', i, j), to run in order. only what changed in a row is in them
+#`lines` are the rows from row `top` on, `eof` is whether they run to the end of the text ~ rows are only ever added or taken away there
+class BoxModel:
+    #the text always has a first row, a window further down can have no rows at all
+    def __init__(self, lines:Iterable=('',), top:int=1, eof:bool=True):
+        self.lines, self.top, self.eof = list(lines), top, eof
+        if not (self.lines or top>1): self.lines.append('')
+        
+    @classmethod
+    def from_text(cls, text:str) -> 'BoxModel': return cls(text.split('\n'))
+    
+    @property
+    def text(self) -> str: return '\n'.join(self.lines)
+    
+    #last row of `lines`
+    @property
+    def bottom(self) -> int: return self.top+len(self.lines)-1
+    
+    #row (r) ~ rows that aren't there are empty
+    def line(self, r:int) -> str:
+        return self.lines[i] if 0<=(i:=r-self.top)<len(self.lines) else ''
+        
+    #rows of (bnd) that exist
+    def rows(self, bnd:SelectBounds) -> range: return range(bnd.br, min(bnd.er, self.bottom)+1)
+    
+    #POSITIONING
+    #'row.col' or (row, col) as (row, col)
+    @staticmethod
+    def rc(p:Any) -> tuple: return tuple(map(int, p.split('.'))) if isinstance(p, str) else tuple(p)
+        
+    #box bounds from (b)egin to (e)nd ~ the direction is from (b) to (e) unless it's given
+    @staticmethod
+    def bounds(b:Any, e:Any, dn:bool=None, rt:bool=None) -> SelectBounds:
+        b, e = BoxModel.rc(b), BoxModel.rc(e)
+        (br,er),(bc,ec) = (sorted(x) for x in zip(b,e))
+        dn = (b[0]<e[0]) if dn is None else dn
+        rt = (b[1]<e[1]) if rt is None else rt
+        return SelectBounds(bc, br, ec, er, ec-bc, er-br, dn, rt)
+        
+    #the corner of (bnd) the caret snaps to
+    @staticmethod
+    def snap(bnd:SelectBounds) -> str: return f'{(bnd.br,bnd.er)[bnd.dn]}.{(bnd.bc,bnd.ec)[bnd.rt]}'
+    
+    #(p)osition one cell in arrow direction (sym) ~ never above the first row or left of the first column
+    @staticmethod
+    def arrow(p:Any, sym:str) -> str:
+        r, c = BoxModel.rc(p)
+        for k,(r2,c2) in ARROWSTEP.items():
+            if k in sym: return f'{max(1,r+r2)}.{max(0,c+c2)}'
+        return None
+        
+    #multiline-caret of (bnd) at column (c)
+    @staticmethod
+    def caret(bnd:SelectBounds, c:int) -> SelectBounds: return BoxModel.bounds((bnd.br, c), (bnd.er, c), bnd.dn, bnd.rt)
+        
+    #SCRIPTS
+    #rows (lo) to (hi) went from (old) to (new) ~ if their count changed, (hi) is the last row of the text
+    @staticmethod
+    def script(lo:int, hi:int, old:list, new:list) -> list:
+        out = []
+        for r, (o, t) in enumerate(zip(old, new), lo):
+            if o==t: continue
+            p, a, z = row_diff(o, t)
+            if   not a: out.append(('insert' , f'{r}.{p}', z))
+            elif not z: out.append(('delete' , f'{r}.{p}', f'{r}.{p+len(a)}'))
+            else      : out.append(('replace', f'{r}.{p}', f'{r}.{p+len(a)}', z))
+        #rows added to, or taken from, the end of the text
+        k = lo+min(len(old), len(new))-1
+        if   len(new)>len(old): out.append(('insert', f'{k}.end', '\n'+'\n'.join(new[len(old):])))
+        elif len(new)<len(old): out.append(('delete', f'{k}.end' if k else '1.0', f'{hi}.end'))
+        return out
+        
+    #run (f) on `lines` and script the difference in rows (lo) to (hi) ~ rows are only added or taken away after (hi)
+    def __edit(self, lo:int, hi:int, f:Callable) -> list:
+        i, j, n = lo-self.top, hi-self.top+1, len(self.lines)
+        old = self.lines[i:j]
+        f()
+        new = self.lines[i:j+len(self.lines)-n]
+        #the text always has a first row
+        if not self.lines and self.top==1: self.lines.append('')
+        return self.script(lo, hi, old, new)
+        
+    #rows (lo) to (hi) become rows (l)
+    def __set(self, lo:int, hi:int, l:list) -> None:
+        self.lines[lo-self.top:hi-self.top+1] = l
+        
+    def __cut(self, bnd:SelectBounds) -> None:
+        if bnd.w and (rows:=self.rows(bnd)):
+            self.__set(rows.start, rows.stop-1, [(s:=self.line(r))[:bnd.bc]+s[bnd.ec:] for r in rows])
+            
+    def __clean(self, bnd:SelectBounds) -> None:
+        if rows:=self.rows(bnd):
+            l = [clean_row(self.line(r), bnd.ec) for r in rows]
+            #the end of the entire text is the only place where box-select will create new lines
+            if self.eof and (bnd.er == self.bottom):
+                while l and not l[-1]: l.pop()
+            self.__set(rows.start, rows.stop-1, l)
+        
+    def __paste(self, l:list, p:Any, pc:int=None) -> None:
+        r, c = self.rc(p)
+        #display column to line every row up on ~ tabs, wide characters and virtual columns included
+        pc  = display_col(column_map(self.line(r)), c) if pc is None else pc
+        new = [paste_col(self.line(x), t, pc) for x, t in enumerate(l, r)]
+        #rows past the end of the text start out empty
+        if r>(b:=self.bottom): new[:0] = ['']*(r-b-1)
+        self.__set(min(r, b+1), min(r+len(l)-1, b), new)
+        
+    #EDITS
+    #the text of (bnd), or None if it's all whitespace
+    def copy(self, bnd:SelectBounds) -> BoxClip:
+        l = [self.line(r)[bnd.bc:bnd.ec] for r in self.rows(bnd)] if bnd.w else []
+        return BoxClip(l, bnd.w, len(l)) if any(map(str.strip, l)) else None
+        
+    def cut(self, bnd:SelectBounds) -> list:
+        return self.__edit(bnd.br, min(bnd.er, self.bottom), lambda: self.__cut(bnd))
+        
+    #remove the whitespace box edits leave behind
+    def clean(self, bnd:SelectBounds) -> list:
+        return self.__edit(bnd.br, min(bnd.er, self.bottom), lambda: self.__clean(bnd))
+        
+    #strip the whitespace box edits added to the end of rows ~ (pads) maps a row to how much whitespace it ended in before them
+    #a row never ends in less than that. blank rows box edits added to the end of the text, from row (grown) on, are taken away again
+    def unpad(self, pads:dict, grown:int=None) -> list:
+        def f():
+            for i, s in enumerate(self.lines):
+                if not ((w:=pads.get(self.top+i)) is None): self.lines[i] = s[:len(t:=s.rstrip())+min(w, len(s)-len(t))]
+            if self.eof and not (grown is None):
+                while self.lines and (self.bottom>=grown) and not self.lines[-1]: self.lines.pop()
+        return self.__edit(self.top, self.bottom, f)
+        
+    #rows (l) at (p)osition, lined up on display column (pc) or the display column of (p)
+    def paste(self, l:list, p:Any, pc:int=None) -> list:
+        r  = self.rc(p)[0]
+        return self.__edit(min(r, self.bottom), min(r+len(l)-1, self.bottom), lambda: self.__paste(l, p, pc))
+        
+    #type (t)ext on every row of (bnd) ~ a box is cut first. returns the script and the multiline-caret after it
+    def type(self, bnd:SelectBounds, t:str) -> tuple:
+        script, ((x,),) = self.typing((bnd,), t)
+        return script, x
+        
+    #Backspace on every row of (bnd) ~ a box is only cut. returns the script and the multiline-caret after it
+    def backspace(self, bnd:SelectBounds) -> tuple:
+        script, ((x,),) = self.typing((bnd,))
+        return script, x
+        
+    #type (t)ext, or Backspace if there is no (t), on every row of every box of (xs) ~ boxes that share a row edit it from the right,
+    #so the columns to the left of each edit still hold. returns the script, and a list of multiline-carets for every box of (xs)
+    #a box whose caret ends up in different columns on different rows becomes a multiline-caret for each run of rows in the same column
+    def typing(self, xs:Iterable, t:str=None) -> tuple:
+        xs   = list(xs)
+        #caret column of rows that don't exist
+        base = [x.bc+len(t) if not (t is None) else x.bc if x.w else max(0, x.bc-1) for x in xs]
+        cols = [{} for _ in xs]
+        on   = {}
+        for k, x in enumerate(xs):
+            for r in self.rows(x): on.setdefault(r, []).append(k)
+        def f():
+            for r, ks in on.items():
+                s, done = self.line(r), []
+                for k in sorted(ks, key=lambda k: xs[k].bc, reverse=True):
+                    x, n = xs[k], len(s)
+                    if x.w: s = s[:x.bc]+s[x.ec:]
+                    if not (t is None): s, c = s[:x.bc]+' '*(x.bc-len(s))+t+s[x.bc:], x.bc+len(t)
+                    elif x.w          : c    = x.bc
+                    else              : c    = max(0, x.bc-1); s = s[:c]+s[x.bc:]
+                    #the carets this row already has, right of this edit, move with what it did to the row
+                    if d:=len(s)-n:
+                        for j in done: 
+                            if not (cols[j][r] is None): cols[j][r] += d
+                    #a caret backspaced into one already there merges with it
+                    cols[k][r] = None if any(cols[j][r]==c for j in done) else c
+                    done.append(k)
+                self.lines[r-self.top] = s
+        if not on: return [], [[self.caret(x, c)] for x, c in zip(xs, base)]
+        script = self.__edit(min(on), max(on), f)
+        
+        #runs of rows with the same caret column ~ merged carets (None) end a run
+        out = []
+        for x, cs, c0 in zip(xs, cols, base):
+            runs, b, c = [], x.br, cs.get(x.br, c0)
+            for r in range(x.br+1, x.er+2):
+                if r>x.er or (cs.get(r, c0)!=c):
+                    if not (c is None): runs.append(self.bounds((b, c), (r-1, c), x.dn, x.rt))
+                    if r<=x.er: b, c = r, cs.get(r, c0)
+            out.append(runs)
+        return script, out
+        
+    #the cells of (bnd) ~ rows that are too short give what they have
+    def cells(self, bnd:SelectBounds) -> list: return [self.line(r)[bnd.bc:bnd.ec] for r in self.rows(bnd)]
+    
+    #the cells of (bnd) become f(cells, *args) ~ what is right of the box moves with the new cells. returns the script and the box around them
+    #a short result leaves the rest of the cells as they were, a long one is cut short
+    def transform(self, bnd:SelectBounds, f:Callable, *args) -> tuple:
+        rows, cells = self.rows(bnd), self.cells(bnd)
+        new  = list(f(cells, *args))[:len(cells)]
+        new += cells[len(new):]
+        def g():
+            l = []
+            for s, t in zip(map(self.line, rows), new):
+                a, z = s[:bnd.bc], s[bnd.ec:]
+                #no trailing whitespace on a row that ends in the box
+                t    = t if z else t.rstrip()
+                l.append(f'{a}{" "*(bnd.bc-len(a)) if t else ""}{t}{z}')
+            self.__set(rows.start, rows.stop-1, l)
+        w = max(map(len, new), default=0)
+        return self.__edit(bnd.br, min(bnd.er, self.bottom), g), self.bounds((bnd.br, bnd.bc), (bnd.er, bnd.bc+w), bnd.dn, bnd.rt)
+        
+    #sort the rows of (bnd) by their cells, or by key(cell) ~ whole rows move, rows with equal keys keep their order. returns the script and (bnd)
+    def sort(self, bnd:SelectBounds, key:Callable=None, reverse:bool=False) -> tuple:
+        rows, cells = self.rows(bnd), self.cells(bnd)
+        keys = cells if key is None else list(map(key, cells))
+        l    = list(map(self.line, rows))
+        l    = [l[i] for i in sorted(range(len(l)), key=keys.__getitem__, reverse=reverse)]
+        return self.__edit(rows.start, rows.stop-1, lambda: self.__set(rows.start, rows.stop-1, l)), bnd
+        
+    #move (bnd) to top-left (p)osition ~ cut and paste. returns the script and the bounds after it
+    #whitespace left behind is the user's or what box edits added, it's for `unpad` to tell which
+    def move(self, bnd:SelectBounds, p:Any) -> tuple:
+        r, c = self.rc(p)
+        clip = self.copy(bnd)
+        def f():
+            self.__cut(bnd)
+            if clip: self.__paste(clip.rows, (r, c))
+        return self.__edit(min(bnd.br, r), min(max(bnd.er, r+bnd.h), self.bottom), f), self.bounds((r, c), (r+bnd.h, c+bnd.w), bnd.dn, bnd.rt)
+
+
+#run BoxModel method (name) on (lines) ~ what pools are given, it returns (script, bounds)
+def box_work(lines:list, top:int, eof:bool, name:str, bnd:SelectBounds, *args) -> tuple:
+    return getattr(BoxModel(lines, top, eof), name)(bnd, *args)
+    
+#the thread pool column transforms run in unless they are given one ~ made on first use
+XFORMPOOL = None
+def transform_pool() -> Executor:
+    global XFORMPOOL
+    if XFORMPOOL is None: XFORMPOOL = ThreadPoolExecutor(max(1, min(4, os.cpu_count() or 1)), 'boxselect')
+    return XFORMPOOL
+
 
 #BOX-SELECT
 class BoxSelectText(Textra):
@@ -130,99 +946,183 @@ class BoxSelectText(Textra):
     #create bounds
     def __bounds(self, b:str=None, e:str=None, dn:bool=None, rt:bool=None, ow:bool=False) -> SelectBounds:
         if (b:=(b or self.__boxstart)) and (e:=(e or self.__boxend)):
-            #parse row/col positions
-            b_ = [*map(int, b.split('.'))]
-            e_ = [*map(int, e.split('.'))]
-            
-            if self.__boxselect:
-                #row and col positions ~ min/max each
-                (br,er),(bc,ec) = (sorted(x) for x in zip(b_,e_))
-                #width, height 
-                w, h = ec-bc, er-br
+            #box-selection ~ the model's bounds
+            if self.__boxselect: bnd = BoxModel.bounds(b, e, dn, rt)
             #regular selection
             else:
                 #row and col positions ~ min/max row
+                b_, e_          = BoxModel.rc(b), BoxModel.rc(e)
                 (br,bc),(er,ec) = b_, e_
                 (br,er)         = sorted((br,er))
+                #selection direction
+                dn  = (b_[0]<e_[0]) if dn is None else dn
+                rt  = (b_[1]<e_[1]) if rt is None else rt
                 #len, height 
-                w, h = len(self.get(f'{br}.{bc}', f'{er}.{ec}')), er-br
+                bnd = SelectBounds(bc, br, ec, er, len(self.get(f'{br}.{bc}', f'{er}.{ec}')), er-br, dn, rt)
                 
             #overwrite    
             if ow:
-                self.__boxstart = f'{br}.{bc}'
-                self.__boxend   = f'{er}.{ec}'
-            
-            #selection direction
-            dn = (b_[0]<e_[0]) if dn is None and (b_ and e_) else dn
-            rt = (b_[1]<e_[1]) if rt is None and (b_ and e_) else rt
+                self.__boxstart = f'{bnd.br}.{bnd.bc}'
+                self.__boxend   = f'{bnd.er}.{bnd.ec}'
                 
             #`h` is actually a count of how many lines come after the first one
-            return SelectBounds(bc, br, ec, er, w, h, dn, rt) 
+            return bnd
         return None
     
-    #selection bounds manager
-    def __bounds_range(self, tag, bo:int=0, eo:int=0, ao:bool=False):
+    #selection bounds manager ~ never changes the text. columns past the end of a line are virtual
+    #with the (old) bounds that are currently drawn, only the difference is redrawn
+    def __bounds_range(self, tag, old:SelectBounds=None) -> None:
         self['insertwidth'] = 0
                     
         if bnd:=self.__lbounds:
-            bc, ec = bnd.bc+int(bo*ao), bnd.ec+int(eo*ao)            #add offsets to begin/end column indexes if 'ao'
-            lr, _  = map(int, self.index(f'{tk.END}-1c').split('.')) #get last row number
+            bc, ec = bnd.bc, bnd.ec
             
-            b,e = [], []                                            
-            for r in range(bnd.br, bnd.er+1):
-                #if we are not trying to exceed the last usable row
-                if r<=lr:  
-                    b.append(f'{r}.{bnd.bc+bo}') #store begin/end indexes
-                    e.append(f'{r}.{bnd.ec+eo}')
-                    
-                    #row, begin column, end column
-                    yield r, bc, ec              
-                        
-                    #create caret
-                    self.__fauxcaret(self.__sindex(f'{r}.{bc}',f'{r}.{ec}', bnd.dn, bnd.rt))
+            #only the rows in view are drawn ~ the rest are filled in as they scroll into view
+            if old: self.__boxdiff(tag, old, bnd)
+            else:
+                #only the rows that differ from what is tagged are retagged
+                rows = self.__rows(bnd, clip=True)
+                self.tag_set(tag, (i for r in rows for i in (f'{r}.{bc}', f'{r}.{ec}')) if bnd.w else ())
+                self.__drawn = set(rows)
+                #the other box-selections lost their tags too
+                if tag==tk.SEL: self.__xdrawn = set()
                 
-            self.caret = self.__sindex(f'{bnd.br}.{bc}',f'{bnd.er}.{ec}', bnd.dn, bnd.rt)
-            self.__fauxcaret(self.caret, main=True, cfg=True)
-            self.set_activeline()
-            self.tag_move(tag, b, e)
+            self.caret = BoxModel.snap(bnd)
+            self.__fauxcaret(self.__rows(bnd), (bc,ec)[bnd.rt], (bnd.br,bnd.er)[bnd.dn])
+            self.__schedule(R_LINE)
+            
+    #tag box-selection (rows) that aren't drawn yet with (tag) ~ tk clamps each range to it's line end
+    def __fill(self, tag:str, rows:Iterable) -> None:
+        if (bnd:=self.__lbounds) and (rows:=[r for r in rows if not r in self.__drawn]):
+            if bnd.w: self.tag_add(tag, *(i for r in rows for i in (f'{r}.{bnd.bc}', f'{r}.{bnd.ec}')))
+            self.__drawn.update(rows)
+    
+    #tag the other box-selections (xs) that are in view, from row (t) to (b), where they aren't drawn yet
+    #not while only BOXSELECT can be tagged ~ they are drawn once it's over
+    def __xfill(self, xs:Iterable, t:int, b:int) -> None:
+        if self.__allow('tag', ('add', tk.SEL)) and (rows:={*range(t, b+1)}-self.__xdrawn):
+            if r:=[i for x in xs if x.w for r in rows if x.br<=r<=x.er for i in (f'{r}.{x.bc}', f'{r}.{x.ec}')]: 
+                self.tag_add(tk.SEL, *r)
+            self.__xdrawn |= rows
+            
+    #untag the other box-selections (xs) ~ only the rows in __xdrawn can have tags
+    def __xuntag(self, xs:Iterable) -> None:
+        if r:=[i for x in xs if x.w for r in self.__xdrawn if x.br<=r<=x.er for i in (f'{r}.{x.bc}', f'{r}.{x.ec}')]:
+            self.tag_remove(tk.SEL, *r)
+    
+    #retag from (o)ld to (n)ew bounds ~ only rows entering or leaving the box, and column strips that changed, are touched
+    def __boxdiff(self, tag:str, o:SelectBounds, n:SelectBounds) -> None:
+        add, rem = [], []
+        #drawn rows that are still in the box
+        keep = {r for r in self.__drawn if n.br<=r<=n.er}
+        
+        #rows leaving the box
+        for r in self.__drawn-keep: rem += f'{r}.{o.bc}', f'{r}.{o.ec}'
+        
+        #rows staying in the box
+        if (o.bc, o.ec) != (n.bc, n.ec):
+            #column strips that are added, column strips that are removed
+            if n.ec<=o.bc or o.ec<=n.bc: sa, sr = ((n.bc, n.ec),), ((o.bc, o.ec),)
+            else:
+                sa = ((n.bc, o.bc), (o.ec, n.ec))
+                sr = ((o.bc, n.bc), (n.ec, o.ec))
+            sa = [(b, e) for b, e in sa if b<e]
+            sr = [(b, e) for b, e in sr if b<e]
+            for r in keep:
+                for b, e in sa: add += f'{r}.{b}', f'{r}.{e}'
+                for b, e in sr: rem += f'{r}.{b}', f'{r}.{e}'
+                
+        #rows entering the box
+        for r in self.__rows(n, clip=True):
+            if not r in keep: add += f'{r}.{n.bc}', f'{r}.{n.ec}'
+            keep.add(r)
+        
+        if rem: self.__defer('tag', 'remove', tag, *rem)
+        if add and n.w: self.__defer('tag', 'add', tag, *add)
+        self.__flush()
+        self.__drawn = keep
+        
+    #rows of (bnd) that exist ~ (clip) to the rows in view, plus a margin
+    def __rows(self, bnd:SelectBounds, clip:bool=False) -> range:
+        i = ('@0,0', f'@0,{self.winfo_height()}')[:2*clip]
+        v = [int(x.split('.')[0]) for x in self.batch((('index', x) for x in i), self.__p)]
+        b, e = bnd.br, min(bnd.er, self.line_count)
+        if v: b, e = max(b, v[0]-VMARGIN), min(e, v[1]+VMARGIN)
+        return range(b, e+1)
          
-    #multiline-caret bounds manager
-    def __typing_range(self, adv:int):
-        self['insertwidth'] = 0
+    #BOX-TYPING ~ type (t), or Backspace if there is no (t), at every box-selection
+    def __type(self, t:str=None) -> None:
+        if not (bnd:=self.__lbounds): return
+        xs = [bnd, *self.__boxes]
+        self.__start(OP_TYPE, self.__typing(xs, t), rows=sum(e-b+1 for b, e in self.__windows((x.br, x.er) for x in xs)))
+        
+    #the rows of the (spans) (first row, last row) that exist, in windows of `chunkrows` rows at most ~ spans that touch share windows
+    def __windows(self, spans:Iterable) -> list:
+        n, out = self.line_count, []
+        for b, e in sorted(spans):
+            e = min(e, n)
+            if out and (b<=out[-1][1]+1): out[-1][1] = max(out[-1][1], e)
+            elif b<=e                   : out.append([b, e])
+        return [(i, min(i+self.chunkrows-1, e)) for b, e in out for i in range(b, e+1, self.chunkrows)]
         
-        #delete faux-carets
+    #a job ~ each window of rows is read in one call, typed by the model, and it's script goes out in one call. only the rows of the boxes are read
+    #every row keeps it's own caret column, so a box that ends up with different columns on different rows splits into a multiline-caret for each run
+    #the job records itself for undo, and takes back what it did if it's cancelled
+    def __typing(self, xs:list, t:str=None):
+        self['insertwidth'] = 0
         self.__blinkreset()
-        for n in self.image_names(): self.delete(n)                 
+        if any(x.w for x in xs): self.tag_move(tk.SEL)
         
-        #if there was something to cut, and adv is negative, stop the caret from retreating
-        if self.__cut() and adv<0: adv=0
+        n, wins = self.line_count, self.__windows((x.br, x.er) for x in xs)
+        runs    = [[] for _ in xs]
+        changes = []
+        #rows past the end of the text are only carets ~ an empty window after the last row
+        tail    = [(k, BoxModel.bounds((max(x.br, n+1), x.bc), (x.er, x.ec), x.dn, x.rt)) for k, x in enumerate(xs) if x.er>n]
+        try:
+            for i, (lo, hi) in enumerate(wins):
+                on  = [(k, BoxModel.bounds((max(x.br, lo), x.bc), (min(x.er, hi), x.ec), x.dn, x.rt)) for k, x in enumerate(xs) if x.br<=hi and lo<=x.er]
+                old = self.get(f'{lo}.0', f'{hi}.end').split('\n')
+                m   = BoxModel(old, lo, hi==n)
+                script, out = m.typing((x for _, x in on), t)
+                for cmd in script: self.__defer(*cmd)
+                self.__flush()
+                changes += ((r, o, z) for r, (o, z) in enumerate(zip(old, m.lines), lo) if o!=z)
+                self.__padded(lo, old, m.lines)
+                for (k, _), rs in zip(on, out): self.__runs(runs[k], rs)
+                if i+1<len(wins): yield (i+1)/len(wins)
+        except GeneratorExit:
+            if changes: self.__boxapply(self.__rowsrecord(changes), False)
+            raise
+        _, out = BoxModel((), n+1).typing((x for _, x in tail), t)
+        for (k, _), rs in zip(tail, out): self.__runs(runs[k], rs)
         
-        if bnd:=self.__lbounds:
-            bc = bnd.bc+adv
-            
-            #type at multiline-caret
-            for r in range(bnd.br, bnd.er+1): 
-                #row, begin column, advance
-                yield r, bc, adv                       
-                self.__fauxcaret(f'{r}.{bc}')
-              
-            #begin/end indexes
-            i = (f'{bnd.br}.{bc}', f'{bnd.er}.{bc}')
-            self.__lbounds = self.__bounds(*i, bnd.dn, bnd.rt, ow=True)
-            self.caret     = self.__sindex (*i, bnd.dn, bnd.rt)
-            self.__fauxcaret(self.caret, main=True, cfg=True)
-            self.set_activeline()
-            self.__blink()
-          
-    #arrow index
-    def __aindex(self, sym:str) -> str:
-        r, c = map(int, self.caret.split('.'))
-        for k,(r2,c2) in self.__arrows.items():
-            if k in sym:
-                r += r2; c += c2
-                self.caret = f'{max(1,r)}.{max(0,c)}'
-                return self.caret
-        return None
+        if (self.__undos is not None) and changes: self.__histpush(self.__rowsrecord(changes))
+        
+        #the box-selection goes on from the run that has it's caret row ~ the rest are the other box-selections
+        r    = (xs[0].br, xs[0].er)[xs[0].dn]
+        rs   = [x for k in runs for x in k]
+        main = next((x for x in runs[0] if x.br<=r<=x.er), None) or (runs[0] or rs)[0]
+        self.__boxes  = BoxIndex(x for x in rs if not x is main)
+        self.__xdrawn = set()
+        
+        self.__lbounds = self.__bounds(f'{main.br}.{main.bc}', f'{main.er}.{main.bc}', main.dn, main.rt, ow=True)
+        self.caret     = BoxModel.snap(main)
+        self.__drawn   = set()
+        self.__fauxcaret(self.__rows(main), main.bc, (main.br,main.er)[main.dn])
+        self.__schedule(R_VIEW|R_LINE)
+        self.__blink()
+        
+    #add the multiline-carets (rs) to the (runs) of a box ~ one that carries on from the last run in the same column joins it
+    @staticmethod
+    def __runs(runs:list, rs:list) -> None:
+        for x in rs:
+            if runs and ((y:=runs[-1]).bc==x.bc) and (y.er+1==x.br): runs[-1] = BoxModel.bounds((y.br, y.bc), (x.er, x.bc), y.dn, y.rt)
+            else: runs.append(x)
+       
+    #arrow index ~ moves the caret from (p)osition, and returns where it would be if every column was valid
+    def __aindex(self, sym:str, p:str=None) -> str:
+        if p:=BoxModel.arrow(p or self.caret, sym): self.caret = p
+        return p
     
     #virtual index
     def __vindex(self, x:int, y:int) -> str:
@@ -231,28 +1131,21 @@ class BoxSelectText(Textra):
         #the top-left visible row,col numbers
         r,c = map(int, self.index('@0,0').split('.'))
         
-        #figure out where we are virtually
-        r = round(y/self.__fh-0.50) + r
-        c = (math.floor,math.ceil)[rt](x/self.__fw) + c
+        #figure out where we are virtually ~ in display columns from the left edge
+        d = max((math.floor,math.ceil)[rt](x/self.__fw) + self.dcol(r, c), 0)
+        r = max(round(y/self.__fh-0.50) + r, 1)
         
         #where we would be if every possible index was valid
-        return f'{max(r,1)}.{max(c,0)}'
-    
-    #snap index
-    def __sindex(self, start:str, end:str, dn:bool, rt:bool) -> str:
-        r, c = zip(map(int, start.split('.')), map(int, end.split('.')))
-        return f'{r[dn]}.{c[rt]}'
+        return f'{r}.{self.ccol(r, d, rt)}'
        
     #CONSTRUCTOR
-    def __init__(self, master, *args, **kwargs):
+    def __init__(self, master, *args, maxfps:int=MAXFPS, chunkms:int=CHUNKMS, chunkrows:int=CHUNKROWS, progress:Callable=None, **kwargs):
         Textra.__init__(self, master, *args, **kwargs)
         
         #box-select tag
         self.tag_configure('BOXSELECT'  , background=self['selectbackground'])
         self.tag_configure('ACTIVELINE' , background=ACT_BG)
-        
-        #capture character width and height, make faux-carets for this font height
-        self.update_font(self['font'])
+        self.tag_configure('BOXMATCH'   , background=MATCH_BG)
         
         #selection insertion point
         self.mark_set(INSPNT, '1.0')
@@ -261,6 +1154,12 @@ class BoxSelectText(Textra):
         #add listeners
         for evt in ('KeyPress','KeyRelease','ButtonPress-1','ButtonRelease-1','Motion'):
             self.bind(f'<{evt}>', self.__handler)
+            
+        #faux-carets and box-selection rows follow the view
+        self.bind('<Configure>', self.__viewchanged, add=True)
+        #faux-carets only blink while they can be seen
+        for evt in ('FocusIn','FocusOut','Map','Unmap'):
+            self.bind(f'<{evt}>', self.__blinkstate, add=True)
         
         #features
         self.__boxselect   = False  #select text within a rect
@@ -273,34 +1172,381 @@ class BoxSelectText(Textra):
         self.__vgrabofs    = None   #vertical offset from 'current' to sel.start
         self.__linsert     = None   #last known 'insert' position ~ used while __as or __selgrab is True
         self.__lbounds     = None   #last bounds that were applied
-        self.__lclipbd     = ''     #back-up of last clipboard data
+        self.__boxes       = BoxIndex() #box-selections besides the one in __lbounds ~ Ctrl+Alt+Shift adds one
+        self.__xdrawn      = set()  #rows where those are currently drawn
+        self.__pads        = {}     #{row: whitespace it ended in} of rows box edits changed, from before they did ~ what's past that is cleaned up on deselect
+        self.__grown       = None   #first row box edits added to the end of the text
+        self.__find        = None   #(regex, match keys, match lengths) of the last box_find ~ keys are None once an edit makes them stale
+        self.__clip        = None   #BoxClip of the last Ctrl+c/x ~ moves and drags copy into their own, and never touch the clipboard
+        self.__clipown     = None   #the system clipboard is served from __clip ~ None until it first is
+        self.__cliptext    = None   #__clip joined into text, the first time something asks for it
+        self.__queue       = []     #widget commands waiting for the next __flush
+        #faux-carets
+        self.__carets      = None   #(rows, column, main row) of the multiline-caret
+        self.__clabels     = []     #pool of overlay labels that draw the faux-carets
+        self.__vframes     = []     #pool of overlay frames that draw selected virtual columns
+        #rendering
+        self.maxfps        = maxfps #frame rate cap
+        self.__frameid     = None   #pending frame
+        self.__framelast   = 0.0    #when the last frame was drawn
+        self.__dirty       = 0      #R_* flags waiting for the next frame
+        self.__skipped     = 0      #updates that were coalesced into a later frame
+        self.__caron       = True   #blink state
+        self.__paused      = False  #blinking is paused while unfocused or hidden
+        self.__focused     = False  #last focus event was FocusIn
+        self.__mapped      = False  #last map event was Map
+        self.__blinkid     = None   #next blink
+        self.__ckey        = None   #(height, colors) of the shared faux-caret images in use
+        self.__drawn       = set()  #box-selection rows that are currently drawn
+        self.__nudge       = None   #(row, col) Shift+Arrows moved the box-selection's top-left to, until the next frame
+        #long box edits
+        self.chunkms       = chunkms   #time budget of one chunk
+        self.chunkrows     = chunkrows #rows per chunk
+        self.progress      = progress  #called with (op, fraction) after every chunk
+        self.__job         = None   #(op, job, (begin row, end row, line count, rows), chunked) of the running job
+        self.__jobid       = None   #next chunk
+        self.__tx          = False  #a job or an undo is editing ~ it's edits aren't recorded one by one
+        self.__xform       = None   #(future, done) of the column transform running in a pool ~ any edit before it's done cancels it
+        self.__xformid     = None   #next check on it
+        #undo ~ tk's own is turned off, only if it was on
+        self.__undos       = deque(maxlen=m if (m:=int(self['maxundo']))>0 else None) if int(self['undo']) else None
+        self.__redos       = []     #undone records
+        self.__group       = None   #plain edits still being grouped
+        self['undo']       = False
+        #instrumentation
+        self.__stats       = None   #ProxyStats while instrumented
+        self.__op          = None   #operation the proxied calls are counted against
         
         self.__as_reset()           #prime ALT+SHIFT properties
         self.__blinkreset()         #prime blink properties
         
+        #capture character width and height, make faux-carets for this font height
+        self.update_font(self['font'])
+        
         #arrow key movement for arrow-key-box-select
-        self.__arrows = {'Down':( 1,0),'Right':(0, 1),
-                         'Up'  :(-1,0),'Left' :(0,-1)}
+        self.__arrows = ARROWSTEP
         
-        #hijack tcl commands stream so we can pinpoint various commands
-        self.__p = self._w + "_orig"
-        self.tk.call("rename", self._w, self.__p)
+        #take over Textra's hijack of the tcl commands stream so we can pinpoint various commands
+        self.__p = self._orig
         self.tk.createcommand(self._w, self.__proxy)
         
          
     #PROXY
     def __proxy(self, cmd, *args) -> Any:
-        #boxselect and dragging only allow the BOXSELECT and ACTIVELINE tags from the moment the mouse is pressed
-        if ((self.__as and self.__as_free) or self.__selgrab) and (cmd=='tag') and args:
-            if args[0] in ('add', 'remove'):
-                if not args[1] in ('BOXSELECT','ACTIVELINE'): 
-                    return
+        if not self.__allow(cmd, args): return
+        
+        #the undo history is ours
+        if (cmd=='edit') and args and (self.__undos is not None): 
+            target = self.__edit(args)
+            if self.__carets: self.__schedule(R_VIEW)
+            return target
+        
+        #edits have to be seen before they run to keep the display-column maps and the undo history current
+        self.watch(cmd, args)
+        self.__histedit(cmd, args)
         
         #the rest of the time
+        t = self.__stats and time.perf_counter()
         try             : target = self.tk.call((self.__p, cmd) + args)#;print(cmd, args)
-        except Exception: return
+        except Exception:
+            if cmd in EDITS: self.forget_lines()
+            if t: self.__record(cmd, args, t, err=True)
+            return
+        if t: self.__record(cmd, args, t)
+        
+        #anything that can move text on screen moves the faux-carets
+        if self.__carets and (cmd in CARETMOVE): self.__schedule(R_VIEW)
         
         return target   
+    
+    #INSTRUMENTATION
+    #count and time every proxied and batched tcl call ~ `on=False` turns it back off. returns the stats, if any
+    def instrument(self, on:bool=True, samples:int=STATSAMPLES, callback:Callable=None) -> ProxyStats:
+        self.__stats = ProxyStats(samples, callback) if on else None
+        return self.__stats
+        
+    @property
+    def stats(self) -> ProxyStats: return self.__stats
+    
+    def __record(self, cmd:str, args:tuple, t:float, n:int=1, err:bool=False) -> None:
+        if (cmd in SUBCMDS) and args: cmd = f'{cmd} {args[0]}'
+        self.__stats.record(cmd, time.perf_counter()-t, self.__op or OP_EVENT, n, err)
+        
+    #batches skip the proxy, so they are counted here
+    def batch(self, cmds:Iterable, w:str=None) -> tuple:
+        if not self.__stats: return Textra.batch(self, cmds, w)
+        cmds, t = tuple(cmds), time.perf_counter()
+        try    : return Textra.batch(self, cmds, w)
+        finally: 
+            if cmds: self.__record('batch', (), t, len(cmds))
+        
+    #boxselect and dragging only allow the BOXSELECT and ACTIVELINE tags from the moment the mouse is pressed
+    def __allow(self, cmd:str, args:tuple) -> bool:
+        if ((self.__as and self.__as_free) or self.__selgrab) and (cmd=='tag') and args:
+            if args[0] in ('add', 'remove'):
+                return args[1] in ('BOXSELECT','ACTIVELINE')
+        return True
+        
+    #BATCH
+    #queue a widget command for the next __flush ~ obeys the same rules as __proxy
+    def __defer(self, cmd:str, *args) -> None:
+        if self.__allow(cmd, args): 
+            self.watch(cmd, args)
+            self.__histedit(cmd, args)
+            self.__queue.append((cmd, *args))
+    
+    #send every queued command to the real widget in one call
+    def __flush(self) -> tuple:
+        q, self.__queue = self.__queue, []
+        return self.batch(q, self.__p)
+        
+    #JOBS
+    #box edits over more than `chunkrows` rows run in chunks between events, `chunkms` at a time ~ Escape cancels them
+    #`progress(op, fraction)` hears about every chunk, fraction is None when the job was cancelled
+    @property
+    def busy(self) -> bool: return (self.__job is not None) or (self.__xform is not None)
+    
+    #run job (g) to the end
+    def __run(self, g) -> Any:
+        try:
+            while True: next(g)
+        except StopIteration as x: return x.value
+        
+    #rows of the box-selection
+    def __extent(self) -> tuple:
+        b, x = self.__lbounds, self.__boxes.span
+        if b and x: return min(b.br, x[0]), max(b.er, x[1])
+        return (b.br, b.er) if b else x or (1, 0)
+        
+    #start job (g) that edits rows (b) to (e) ~ small jobs just run, a job started by a job is part of it
+    #a job that edits some of the (rows) in between records itself, and takes itself back when it's closed
+    def __start(self, op:str, g, b:int=1, e:int=0, rows:int=None) -> None:
+        if self.__tx: 
+            self.__run(g)
+            return
+        self.__finish()
+        chunked = ((e-b) if rows is None else rows) >= self.chunkrows
+        n       = self.line_count
+        b, e    = min(max(1, b), n), min(e, n)
+        #everything it takes to put the rows back ~ for a cancel, and for undo
+        snap    = (b, e, n, self.get(f'{b}.0', f'{e}.end')) if (rows is None) and (chunked or (self.__undos is not None)) else None
+        self.__histclose()
+        self.__tx, self.__job = True, (op, g, snap, chunked)
+        if chunked: self.__step()
+        else      : self.__finish()
+        
+    #run chunks of the job until it's time budget is spent ~ what it sends is counted against it's op, then the op goes back to what it was
+    def __step(self) -> None:
+        self.__jobid = None
+        if not (j:=self.__job): return
+        t = time.perf_counter() + self.chunkms/1000
+        op, self.__op = self.__op, j[0]
+        try:
+            f = next(j[1])
+            while time.perf_counter()<t: f = next(j[1])
+        except StopIteration: 
+            self.__jobdone()
+            return
+        finally: self.__op = op
+        if self.progress: self.progress(j[0], f)
+        self.__jobid = self.after(1, self.__step)
+        
+    def __jobcancel(self) -> None:
+        if not (self.__jobid is None): self.after_cancel(self.__jobid)
+        self.__jobid = None
+        
+    #run the rest of the job right now
+    def __finish(self) -> None:
+        if j:=self.__job:
+            self.__jobcancel()
+            op, self.__op = self.__op, j[0]
+            try:
+                self.__run(j[1])
+                self.__jobdone()
+            finally: self.__op = op
+            
+    #the job ran to the end ~ it's rows, before and after, become one undo record
+    def __jobdone(self) -> None:
+        op, g, snap, chunked = self.__job
+        self.__job = None
+        if snap and (self.__undos is not None):
+            b, e, n, old = snap
+            new = self.get(f'{b}.0', f'{e+self.line_count-n}.end')
+            if (new!=old) and (rec:=self.__boxrecord(b, old.split('\n'), new.split('\n'))): self.__histpush(rec)
+        self.__tx = False
+        if chunked and self.progress: self.progress(op, 1.0)
+            
+    #stop the job and put it's rows back
+    def __cancel(self) -> None:
+        if j:=self.__job:
+            op, g, snap, _ = j
+            self.__jobcancel()
+            self.__job = None
+            o, self.__op = self.__op, op
+            try:
+                g.close()
+                #rows are only ever added or removed inside the job's rows, or at the end of the text
+                if snap:
+                    b, e, n, t = snap
+                    self.replace(f'{b}.0', f'{e+self.line_count-n}.end', t)
+            finally: self.__op = o
+            #what box edits added before the job may have been put back too
+            self.__pads, self.__grown = {}, None
+            self.__tx = False
+            if self.__boxselect and self.__lbounds: self.__bounds_range(tk.SEL)
+            if self.progress: self.progress(op, None)
+        
+    #UNDO
+    #tk's own undo is replaced ~ plain edits are recorded as they go through the proxy and grouped like autoseparators would,
+    #every box job is one compact record of the rows it changed. `edit undo/redo/separator/reset/canundo/canredo` all work on this history
+    def __edit(self, args:tuple) -> Any:
+        if   args[0] in ('undo', 'redo'): self.__undo(args[0]=='redo')
+        elif args[0] == 'separator'     : self.__histclose()
+        elif args[0] == 'reset'         : self.__histclose(); self.__undos.clear(); self.__redos.clear()
+        elif args[0] == 'canundo'       : return int(bool(self.__undos))
+        elif args[0] == 'canredo'       : return int(bool(self.__redos))
+        else                            : return self.tk.call((self.__p, 'edit') + args)
+        return ''
+        
+    def __histclose(self) -> None:
+        self.__group = None
+        
+    def __histpush(self, rec:Any) -> None:
+        self.__redos.clear()
+        self.__undos.append(rec)
+        
+    #record plain edit (cmd, args) before it runs ~ as (kind, index, text) ops, 'i'nserted or 'd'eleted
+    def __histedit(self, cmd:str, args:tuple) -> None:
+        if (self.__undos is None) or self.__tx or not ((cmd in EDITS) and args and self.recording): return
+        ops = []
+        if cmd != 'insert':
+            i = args if cmd=='delete' else args[:2]
+            if len(i)%2: i = (*i, f'{i[-1]}+1c')
+            #the last range goes first, like tk does it
+            for n in range(len(i)-2, -1, -2):
+                b, e = self.batch((('index', i[n]), ('index', i[n+1])), self.__p)
+                if t:=self.tk.call(self.__p, 'get', b, e): ops.append(('d', b, str(t)))
+        if cmd != 'delete':
+            #tk inserts at the end before the last line break
+            b, end, last = self.batch((('index', args[0]), ('index', 'end'), ('index', 'end-1c')), self.__p)
+            if t:=''.join(map(str, args[1::2] if cmd=='insert' else args[2::2])): ops.append(('i', last if b==end else b, t))
+        if not ops: return
+        
+        #continue the group while the edits run on from each other
+        if not (self.__group and self.__joins(self.__group[-1], ops[0])):
+            self.__histpush(g:=[])
+            self.__group = g
+        self.__redos.clear()
+        self.__group.extend(ops)
+        
+    #(o)p runs on from (p)revious op ~ typing, backspacing or deleting along one line
+    @staticmethod
+    def __joins(p:tuple, o:tuple) -> bool:
+        if (p[0]!=o[0]) or ('\n' in p[2]) or ('\n' in o[2]): return False
+        (pr,pc),(r,c) = (map(int, x[1].split('.')) for x in (p,o))
+        if pr!=r: return False
+        return (c==pc+len(p[2])) if o[0]=='i' else (c==pc) or (c+len(o[2])==pc)
+        
+    #rows (old) that start at row (b) became rows (new) ~ only what changed in each row is kept
+    #every part that is the same on all rows is kept once. rows that were added or removed keep the whole rows
+    def __boxrecord(self, b:int, old:list, new:list) -> BoxRecord:
+        if len(old)!=len(new): return BoxRecord(range(b, b+1), None, tuple(old), tuple(new))
+        return self.__rowsrecord((r, o, t) for r, (o, t) in enumerate(zip(old, new), b) if o!=t)
+        
+    #(changes) are (row, old, new) in row order ~ rows that stay the same can be left out
+    def __rowsrecord(self, changes:Iterable) -> BoxRecord:
+        rows, cols, olds, news = array('I'), array('I'), [], []
+        for r, o, t in changes:
+            p, a, z = row_diff(o, t)
+            rows.append(r); cols.append(p)
+            olds.append(a); news.append(z)
+        if not rows: return None
+        one = lambda v: v[0] if v.count(v[0])==len(v) else tuple(v)
+        return BoxRecord(range(rows[0], rows[-1]+1) if rows[-1]-rows[0]+1==len(rows) else rows,
+                         cols[0] if cols.count(cols[0])==len(cols) else cols, one(olds), one(news))
+        
+    #undo, or (redo), the last record
+    def __undo(self, redo:bool=False) -> None:
+        self.__finish()
+        self.__histclose()
+        src, dst = (self.__undos, self.__redos)[::(1,-1)[redo]]
+        if not src: return
+        #a box left up would be cleaned up on the text that is coming back
+        if self.__boxselect: self.__boxreset(False)
+        dst.append(rec:=src.pop())
+        self.__tx = True
+        #plain edits
+        if isinstance(rec, list):
+            for k, i, t in (rec if redo else reversed(rec)):
+                if (k=='i')==redo: self.watch('insert', (i, t))       ; self.tk.call(self.__p, 'insert', i, t)
+                else             : self.watch('delete', (i, f'{i}+{len(t)}c')); self.tk.call(self.__p, 'delete', i, f'{i}+{len(t)}c')
+            self.caret = i
+        #rows that were added or removed
+        elif rec.col is None:
+            o, t = (rec.old, rec.new)[::(1,-1)[redo]]
+            b    = rec.rows.start
+            self.replace(f'{b}.0', f'{b+len(t)-1}.end', '\n'.join(o))
+            self.caret = f'{b}.0'
+        #box
+        else:
+            self.__boxapply(rec, redo)
+            self.caret = f'{rec.rows[0]}.{rec.col if isinstance(rec.col, int) else rec.col[0]}'
+        self.__tx = False
+        self.see(tk.INSERT)
+        
+    #undo, or (redo), box record (rec) ~ every row edit goes out in one call
+    def __boxapply(self, rec:BoxRecord, redo:bool) -> None:
+        o, t = (rec.old, rec.new)[::(1,-1)[redo]]
+        for k, r in enumerate(rec.rows):
+            c    = rec.col if isinstance(rec.col, int) else rec.col[k]
+            a, z = (o if isinstance(o, str) else o[k]), (t if isinstance(t, str) else t[k])
+            if z: self.__defer('delete', f'{r}.{c}', f'{r}.{c+len(z)}')
+            if a: self.__defer('insert', f'{r}.{c}', a)
+        self.__flush()
+        
+    #RENDER
+    #updates that arrive faster than `maxfps` are coalesced ~ `skipped` counts the ones that never got their own frame
+    @property
+    def skipped(self) -> int: return self.__skipped
+    
+    #mark (flags) dirty and make sure a frame is coming
+    def __schedule(self, flags:int=R_VIEW) -> None:
+        if self.__frameid is None:
+            wait = self.__framelast + 1/max(1, self.maxfps) - time.perf_counter()
+            self.__frameid = self.after(math.ceil(wait*1000), self.__render) if wait>0 else self.after_idle(self.__render)
+        #an update of the same kind was still waiting, it gets replaced
+        elif flags & self.__dirty: self.__skipped += 1
+        self.__dirty |= flags
+        
+    #view changes only need the overlay redrawn
+    def __viewchanged(self, *_) -> None:
+        self.__schedule(R_VIEW)
+        
+    #draw everything that is dirty, in order ~ steps can dirty later steps of the same frame
+    def __render(self) -> None:
+        self.__framelast = time.perf_counter()
+        if self.winfo_exists():
+            op = self.__op
+            for f, self.__op, step in ((R_MOVE, OP_MOVE, self.__nudged), (R_BOX, OP_BOX, self.__boxdraw), (R_LINE, OP_LINE, self.set_activeline), (R_VIEW, OP_VIEW, self.__caretdraw)):
+                if self.__dirty & f:
+                    self.__dirty &= ~f
+                    step()
+            self.__op = op
+        self.__frameid, self.__dirty = None, 0
+        
+    #draw a pending box right away ~ for anything that depends on the box being current
+    def __sync(self) -> None:
+        if (self.__frameid is not None) and (self.__dirty & (R_BOX|R_MOVE)):
+            self.after_cancel(self.__frameid)
+            self.__render()
+            
+    #draw the box-selection up to the latest box end
+    def __boxdraw(self) -> None:
+        #never use overwrite here, if you do you will lose the proper selection direction
+        if self.__boxselect and (bnd:=self.__bounds(ow=False)) and (bnd != self.__lbounds):
+            #overwrite last bounds and draw the difference ~ columns past the line end are virtual
+            old, self.__lbounds = self.__lbounds, bnd
+            self.__bounds_range('BOXSELECT', old)
         
     def set_activeline(self):
         r,_ = map(int, self.caret.split('.'))
@@ -309,10 +1555,10 @@ class BoxSelectText(Textra):
             
     #FONT
     def update_font(self, font:Iterable) -> None:
-        self.__font = tkf.Font(font=font)
-        self.__fw   = self.__font.measure(' ')
-        self.__fh   = self.__font.metrics('linespace')
-        self.config(font=font, tabs=self.__fw*4)
+        #the font's actual attributes key the metrics cache ~ a named font keeps it's name when it is reconfigured
+        key = tuple(map(str, self.tk.splitlist(self.tk.call('font', 'actual', font))))
+        self.__fw, self.__fh = font_metrics(self._root(), key)
+        self.config(font=font, tabs=self.__fw*TABS)
         #create faux-carets for this font height
         self.__loadcarets()
      
@@ -320,58 +1566,152 @@ class BoxSelectText(Textra):
     def __loadcarets(self) -> None:
         #store insert on/off times for faux-caret `.after` calls
         self.__instime = (self['insertofftime'], self['insertontime'])
-        fh = self.__fh    #font height from 'linespace'
-        
-        #make a temp xbm file
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.xbm', delete=False) as f:
-            #create prettyprint xbm data
-            xbmdata = ',\n\t'.join(','.join('0xFF' for _ in range(min(8, fh-(8*i)))) for i in range(math.ceil(fh/8)))
-            #write xbm
-            f.write((f"#define image_width {INSWIDTH}\n#define image_height {fh}\n"
-                     "static unsigned char image_bits[] = {\n\t"
-                     f'{xbmdata}}};').encode())
-                     
-        #load xbm files for faux-caret ~ they have to be in this order
+        #let go of the images for the last font
+        self.__dropcarets()
+        
+        #(foreground, background) of each faux-caret image ~ [main][on], an empty background is transparent
+        self.__ccolors = (((ACT_BG, ''), (SDW_CT, self['background'])),                   #shadow caret off/on
+                          ((ACT_BG, ''), (self['insertbackground'], ACT_BG)))             #main caret off/on
+        
+        #faux-caret images ~ they have to be in this order
+        #every shadow caret shares one image, blinking recolors the images instead of the carets
+        #widgets share fixed images with the carets on. the first blink gives a widget images of it's own, so one widget's blink never shows in another
         #never touch this directly. use __fauxcaret.
-        self.__  = (tk.BitmapImage(file=f.name, foreground=SDW_CT,background=self['background']),       #shadow caret 
-                    tk.BitmapImage(file=f.name, foreground=ACT_BG),#self['background']),                         #off caret
-                    tk.BitmapImage(file=f.name, foreground=self['insertbackground'],background=ACT_BG)) #main caret  
+        on = tuple(c[1] for c in self.__ccolors)
+        self.__      = CaretBitmaps.acquire(self, self.__fh, on) #shadow caret, main caret
+        self.__ckey  = (self.__fh, on)
+        self.__own   = None #this widget's own images, once it blinks
+        self.__caron = True
+        
+    #release the shared faux-caret images
+    def __dropcarets(self) -> None:
+        if self.__ckey: CaretBitmaps.release(self, *self.__ckey)
+        self.__ckey = None
         
-        #delete file
-        os.unlink(f.name)
+    def destroy(self) -> None:
+        self.__jobcancel()
+        self.__xformcancel()
+        self.__dropcarets()
+        #the blink and the next frame would come back to a widget that is gone
+        self.__blinkcancel()
+        if not (self.__frameid is None): self.after_cancel(self.__frameid)
+        self.__frameid = None
+        Textra.destroy(self)
     
-    #faux-caret create or config
-    def __fauxcaret(self, index:str, on:bool=True, main:bool=False, cfg:bool=False) -> None:
-        (self.image_create, self.image_configure)[cfg](index, image=self.__[(main<<on)|(on^1)])
+    #faux-carets, and box-selected columns past the end of a line, are drawn on overlay widgets, never in the text
+    #(rows) at (c)olumn, with the main caret on (m)ain (r)ow ~ only the rows on screen get a widget, so redrawing costs O(visible rows)
+    def __fauxcaret(self, rows:range=None, c:int=0, mr:int=0) -> None:
+        self.__carets = (rows, c, mr) if rows else None
+        self.__schedule(R_VIEW)
+    
+    #place a label on every visible faux-caret row, cover every visible virtual column of a box-selection, and hide the rest
+    def __caretdraw(self) -> None:
+        cmds, nc, nv = [], 0, 0
+        
+        if self.winfo_exists() and self.winfo_ismapped():
+            bnd = self.__lbounds if self.__boxselect else None
+            #draw box-selection rows that scrolled into view
+            if bnd: self.__fill((tk.SEL,'BOXSELECT')[self.__as or self.__selgrab], self.__rows(bnd, clip=True))
+            
+            #(rows, caret column, main row, bounds) of every multiline-caret on screen
+            carets = []
+            if self.__carets or (self.__boxselect and self.__boxes):
+                #first and last visible rows
+                t,_  = map(int, self.index('@0,0').split('.'))
+                b,_  = map(int, self.index(f'@0,{self.winfo_height()}').split('.'))
+                #the other box-selections are multiline-carets too
+                if self.__boxselect and (xs:=self.__boxes.within(t, b)):
+                    self.__xfill(xs, t, b)
+                    carets = [(range(max(x.br, t), min(x.er, b)+1), (x.bc, x.ec)[x.rt], 0, x) for x in xs]
+                if cs:=self.__carets:
+                    rows, c, mr = cs
+                    carets.append((range(max(rows.start, t), min(rows.stop-1, b)+1), c, mr, bnd))
+                
+            #line end geometry where there are virtual columns and caret geometry where the caret is on the text ~ in one call
+            q, lcs = [], []
+            for rows, c, mr, bx in carets:
+                #only a box-selection with a width has virtual columns to cover
+                ec = bx.ec if (bx and bx.w) else c
+                lcs.append(ls:=self.line_lengths(rows))
+                q += (('bbox', f'{r}.{x}') for r, lc in zip(rows, ls) for x in ('end',)*(ec>lc)+(c,)*(c<=lc))
+            q = iter(self.batch(q, self.__p))
+            
+            for (rows, c, mr, bx), ls in zip(carets, lcs):
+                bc, ec = (bx.bc, bx.ec) if (bx and bx.w) else (c, c)
+                for r, lc in zip(rows, ls):
+                    eg = self.tk.splitlist(next(q)) if ec>lc else ()
+                    cg = self.tk.splitlist(next(q)) if c<=lc else ()
+                    
+                    #virtual columns are measured from the line end
+                    if eg and ec>lc:
+                        vc = max(bc, lc)
+                        if nv == len(self.__vframes):
+                            self.__vframes.append(tk.Frame(self, bd=0, highlightthickness=0, 
+                                                           background=self['selectbackground'], cursor='xterm'))
+                        cmds.append(('place', str(self.__vframes[nv]), '-x', int(eg[0])+(vc-lc)*self.__fw, '-y', eg[1], 
+                                                                       '-width', (ec-vc)*self.__fw, '-height', eg[3]))
+                        nv += 1
+                        
+                    #caret position
+                    if   c<=lc and cg: x, y = cg[:2]
+                    elif c> lc and eg: x, y = int(eg[0])+(c-lc)*self.__fw, eg[1]
+                    else             : continue #scrolled out of view horizontally
+                    
+                    if nc == len(self.__clabels):
+                        self.__clabels.append(tk.Label(self, bd=0, highlightthickness=0, padx=0, pady=0, 
+                                                       background=self['background'], cursor='xterm'))
+                    cmds += (('place', l:=str(self.__clabels[nc]), '-x', x, '-y', y), 
+                             (l, 'configure', '-image', str(self.__[r==mr])))
+                    nc += 1
+        
+        #hide everything that isn't needed
+        for w in (*self.__clabels[nc:], *self.__vframes[nv:]): cmds.append(('place', 'forget', str(w)))
+        self.batch(cmds, '')
+        
+    #color the faux-caret images for the current blink state ~ two calls, no matter how many carets there are
+    #the shared images are swapped for this widget's own first, the next frame puts them on the carets
+    def __caretcfg(self) -> None:
+        if self.__own is None:
+            self.__own = self.__ = tuple(tk.BitmapImage(master=self, data=CaretBitmaps.xbm(self.__fh)) for _ in self.__ccolors)
+            self.__schedule(R_VIEW)
+        self.batch(((str(img), 'configure', '-foreground', fg, '-background', bg) 
+                     for img, (fg, bg) in zip(self.__, (c[self.__caron] for c in self.__ccolors))), '')
     
     #blink the faux-caret(s)
     def __blink(self, on:bool=True):
-        if not self.__boxselect: return #nothing to do
+        self.__blinkcancel()
+        #nothing to do, or paused
+        if not (self.__boxselect and self.__carets) or self.__paused: return 
         
-        #so we only do this once per first blink
-        if not self.__blinksort:
-            self.__blinksort = sorted((self.index(n) for n in self.image_names()), key=lambda i: float(i))
-            
-        if idx:=self.__blinksort:
-            if bnd:=self.__lbounds:
-                on = not on
-                #reconfigure all carets
-                for i in idx: self.__fauxcaret(i, on=on, cfg=True)  
-                #reconfigure "active line" caret, if off it will assign off again
-                i = self.__sindex(idx[0], idx[-1], bnd.dn, bnd.rt)
-                self.__fauxcaret(i, on=on, main=True, cfg=True)
-                #schedule next call
-                self.__blinkid = self.after(self.__instime[on], self.__blink, on)
-                return
+        self.__caron = on = not on
+        op, self.__op = self.__op, OP_BLINK
+        self.__caretcfg()
+        self.__op = op
+        #schedule next call
+        self.__blinkid = self.after(self.__instime[on], self.__blink, on)
     
-    #reset blink data
-    def __blinkreset(self) -> None:
+    #blinking pauses while the widget is unfocused or hidden ~ it only resumes when it is both focused and mapped
+    def __blinkstate(self, event) -> None:
+        if event.type in (tk.EventType.FocusIn, tk.EventType.FocusOut): self.__focused = event.type == tk.EventType.FocusIn
+        else                                                          : self.__mapped  = event.type == tk.EventType.Map
+        self.__paused = not (self.__focused and self.__mapped)
+        if self.__paused: self.__blinkreset()
+        else            : self.__blink(False) #resume with the faux-carets on
+        
+    #cancel the next blink
+    def __blinkcancel(self) -> None:
         try             : self.after_cancel(self.__blinkid) if not (self.__blinkid is None) else None
         except Exception: pass
-        
-        self.__blinkid   = None
-        self.__blinksort = None
+        self.__blinkid = None
+    
+    #reset blink data
+    def __blinkreset(self) -> None:
+        self.__blinkcancel()
         self['cursor']   = 'xterm'
+        #leave the faux-carets on
+        if not self.__caron:
+            self.__caron = True
+            self.__caretcfg()
        
     #ALT+SHIFT
     def __as_reset(self) -> None:
@@ -382,54 +1722,78 @@ class BoxSelectText(Textra):
         self.__as_mouse  = False
           
     def __as_release(self, state:int=0) -> None:
+        self.__sync()
         self.__as_reset()
         self.__as_free = not self.__boxselect #adjust
+        #box-selections never overlap ~ the new one replaces any it's on top of
+        if (b:=self.__lbounds) and (xs:=self.__boxes.overlaps(b)):
+            self.__xuntag(xs)
+            for x in xs: self.__boxes.remove(x)
         self.tag_replace('BOXSELECT', tk.SEL)
         self.__blink()
         
     #BOXSELECT
     #reset box-select data    
-    def __boxreset(self) -> None:
+    def __boxreset(self, clean:bool=True) -> None:
         self['insertwidth'] = INSWIDTH #reset caret display width
         self.tag_move(tk.SEL)          #delete tk.SEL tags
         self.__as_reset()
-        self.__boxclean()
+        if clean and self.__pads: self.__start(OP_CLEAN, self.__unpadding(self.__pads, self.__grown, not self.__tx), rows=len(self.__pads))
+        self.__pads, self.__grown = {}, None
         self.__blinkreset()
+        self.__fauxcaret()  #remove faux-carets
+        self.__dirty    &= ~(R_BOX|R_MOVE)
+        self.__nudge     = None
+        self.__drawn     = set()
         self.__boxselect = False
         self.__boxstart  = None
         self.__boxend    = None
         self.__lbounds   = None
+        self.__xdrawn    = set()
+        self.__boxes.clear()
         
-    #remove any whitespace that box-select created  
-    def __boxclean(self, bnd:SelectBounds=None) -> None:
-        if bnd:=(bnd or self.__lbounds):
-            self.__blinkreset()
-            for n in self.image_names(): self.delete(n) #delete faux-carets
-            p = self.caret
-            for nr in range(bnd.br, bnd.er+1):
-                b, e = f'{nr}.0', f'{nr}.end'
-                t  = self.get(b, e) #get entire row
-                #if the entire row is just whitespace, get rid of the whitespace
-                if not len(ILWHITE.sub('', t)): self.replace_text(b, e, '')
-                else:
-                    #strip only to the right of the column
-                    self.replace_text(f'{nr}.{bnd.ec}', e, t[bnd.ec:].rstrip())
-            self.caret = p  
+    #rows (old) that start at row (lo) became rows (new) by a box edit ~ remember how much whitespace each row ended in before box edits
+    #first changed it, and where they added rows. edits inside a row don't change what it's end was
+    def __padded(self, lo:int, old:list, new:list) -> None:
+        pads = self.__pads
+        for r, (o, t) in enumerate(zip(old, new), lo):
+            if (o!=t) and not (r in pads): pads[r] = len(o)-len(o.rstrip())
+        for r in range(lo+len(new), lo+len(old)): pads.pop(r, None)
+        if len(new)>len(old):
+            pads.update(dict.fromkeys(range(lo+len(old), lo+len(new)), 0))
+            self.__grown = min(g for g in (self.__grown, lo+len(old)) if not g is None)
             
-            #the end of the entire text is the only place where box-select will create new lines
-            r,_ = map(int, self.index('end-1c').split('.'))
-            #if we are on the last row
-            if nr == r:
-                #delete the last row until either it isn't blank or `nr` is exhausted
-                while not (l:=len(self.get(f'{nr}.0', 'end-1c'))) and nr>=bnd.br:
-                    self.delete(f'{nr-1}.end', 'end-1c')
-                    nr-=1
-                    self.caret = p 
-
-    #update __lbounds (w)ith (g)rab (o)ffsets
-    def __boxmove(self, wgo:bool=True) -> SelectBounds:
+    #a job ~ undo the whitespace box edits added, and only that. the rows are read in windows from the bottom up, each in one call, 
+    #the model strips them and it's script goes out in one call. it's (record)ed as plain deletes, the rows that didn't change aren't in it
+    def __unpadding(self, pads:dict, grown:int, record:bool):
+        self.__blinkreset()
+        p, ops = self.caret, []
+        wins   = self.__windows((r, r) for r in pads)[::-1]
+        try:
+            for i, (lo, hi) in enumerate(wins):
+                old = self.get(f'{lo}.0', f'{hi}.end').split('\n')
+                m   = BoxModel(old, lo, hi==self.line_count)
+                if script:=m.unpad(pads, grown):
+                    #what each delete takes away ~ the rows that are taken away go with the line break before them
+                    new = m.lines
+                    ops += (('d', f'{r}.{len(t)}', o[len(t):]) for r, (o, t) in enumerate(zip(old, new), lo) if o!=t)
+                    if len(new)<len(old):
+                        k = lo+len(new)-1
+                        ops.append(('d', f'{k}.{len(new[-1]) if new else self.line_length(k)}', '\n'+'\n'.join(old[len(new):])))
+                    for cmd in script: self.__defer(*cmd)
+                    self.__flush()
+                if i+1<len(wins): yield (i+1)/len(wins)
+        except GeneratorExit:
+            for _, i, t in reversed(ops): self.__defer('insert', i, t)
+            self.__flush()
+            raise
+        self.caret = p
+        if record and ops and (self.__undos is not None): self.__histpush(ops)
+        
+    #update __lbounds (w)ith (g)rab (o)ffsets ~ to (p)osition or the caret
+    def __boxmove(self, wgo:bool=True, p:str=None) -> SelectBounds:
         if b:=self.__lbounds:
-            r, c = map(int, self.caret.split('.'))
+            r, c = map(int, (p or self.caret).split('.'))
             #update bounds
             if self.__boxselect:
                 r = r if not wgo else max(1, r+self.__vgrabofs)
@@ -439,91 +1803,372 @@ class BoxSelectText(Textra):
                 self.__lbounds = self.__bounds(f'{r}.{c}', self.index(f'{r}.{c}+{b.w}c'), dn=b.dn, rt=b.rt)
                 
         return self.__lbounds
+        
+    #box-selection at (r)ow, (c)ol ~ from the bounds, never the tags
+    def __boxat(self, r:int, c:int) -> SelectBounds:
+        if (b:=self.__lbounds) and (b.br<=r<=b.er) and (b.bc<=c<b.ec): return b
+        return self.__boxes.at(r, c)
+        
+    #ADD BOX(Ctrl+Alt+Shift) ~ the box-selection joins the others, and a new one starts at (p)
+    def __boxpush(self, p:str) -> None:
+        if b:=self.__lbounds: self.__boxes.add(b)
+        self.__fauxcaret()
+        self.__dirty   &= ~R_BOX
+        self.__drawn    = set()
+        self.__xdrawn   = set()
+        self.__boxstart = self.__boxend = self.__lbounds = None
+        self.__as_reset()
+        self.__as       = True
+        self.__linsert  = p
+        
+    #drop every box-selection but (x), or the current one ~ moving and dragging are for one box
+    def __boxsingle(self, x:SelectBounds=None) -> None:
+        if xs:=tuple(self.__boxes):
+            self.__boxes.clear()
+            if (x:=(x or self.__lbounds)) == self.__lbounds: self.__xuntag(xs)
+            else:
+                self.__lbounds = self.__bounds(f'{x.br}.{x.bc}', f'{x.er}.{x.ec}', x.dn, x.rt, ow=True)
+                self.__bounds_range(tk.SEL)
+            self.__xdrawn = set()
+            self.__schedule(R_VIEW)
+            
+    #every box-selection, top to bottom
+    @property
+    def boxes(self) -> tuple:
+        return tuple(sorted((self.__lbounds, *self.__boxes), key=lambda x: (x.br, x.bc))) if self.__boxselect and self.__lbounds else ()
+        
+    #box-select from (b)egin to (e)nd, keeping any box-selection there is ~ one that overlaps it is dropped
+    def add_box(self, b:str, e:str) -> SelectBounds:
+        self.__finish()
+        if self.__boxselect and self.__lbounds: self.__boxes.add(self.__lbounds)
+        else: self.__boxreset()
+        self.__boxselect, self.__as_free = True, False
+        self.__lbounds = self.__bounds(b, e, ow=True)
+        if xs:=self.__boxes.overlaps(self.__lbounds):
+            self.__xuntag(xs)
+            for x in xs: self.__boxes.remove(x)
+        self.__bounds_range(tk.SEL)
+        return self.__lbounds
 
     #CLIPBOARD
-    #restore clipboard data to last clipboard
-    def __restore_clipboard(self) -> None:
-        if self.__lclipbd:
+    #(clip) becomes the system clipboard ~ on x11 the clipboard is only asked for it's text when something pastes it
+    #everywhere else the clipboard has to have the text now
+    def __clipclaim(self, clip:BoxClip) -> None:
+        self.__clip, self.__cliptext = clip, None
+        if self._windowingsystem == 'x11':
+            #the handler, and the command for losing the clipboard to someone else, are only registered once
+            if self.__clipown is None:
+                self.selection_handle(self.__clipserve, selection='CLIPBOARD')
+                self.__lostcmd = self.register(self.__cliplost)
+            self.tk.call('selection', 'own', '-selection', 'CLIPBOARD', '-command', self.__lostcmd, self._w)
+            self.__clipown = True
+        else:
             self.clipboard_clear()
-            self.clipboard_append(self.__lclipbd)
+            self.clipboard_append(self.__clipjoin())
+            
+    def __clipjoin(self) -> str:
+        if self.__cliptext is None: self.__cliptext = '\n'.join(self.__clip.rows)
+        return self.__cliptext
+        
+    def __cliplost(self) -> None:
+        self.__clipown = False
+        
+    #x11 asks for the clipboard in pieces
+    def __clipserve(self, offset:str, length:str) -> str:
+        return self.__clipjoin()[(o:=int(offset)):o+int(length)] if self.__clip else ''
+        
+    #rows the clipboard would paste, or None ~ straight from __clip while it is the clipboard
+    def __clipboard(self) -> list:
+        if self.__clipown and self.__clip: return self.__clip.rows
+        try               : return self.clipboard_get().split('\n')
+        except tk.TclError: return None
 
+    #selected ranges ~ box-selections come from their bounds, because only the rows in view are tagged
+    #every box-selection, top to bottom, unless it's just (bnd)
+    def __ranges(self, bnd:SelectBounds=None) -> tuple:
+        if self.__boxselect:
+            xs = (bnd,) if bnd else sorted((self.__lbounds, *self.__boxes), key=lambda x: (x.br, x.bc)) if self.__lbounds else ()
+            return tuple(i for x in xs if x.w for r in self.__rows(x) for i in (f'{r}.{x.bc}', f'{r}.{x.ec}'))
+        return self.tag_ranges(tk.SEL)
+        
     #remove every selection-related thing 
-    def __cut(self, p:str=None) -> bool:
+    def __cut(self, p:str=None, bnd:SelectBounds=None) -> bool:
         #get selection ranges
-        r = self.tag_ranges(tk.SEL)
-        for i in range(0, len(r), 2):
-            self.tag_remove(tk.SEL, *r[i:i+2])  #remove tk.SEL tag
-            self.replace_text(*r[i:i+2], '')    #delete selected text
-        self.caret = p or self.caret            #put the caret somewhere
+        if r:=self.__ranges(bnd):
+            self.tag_move(tk.SEL)                      #remove tk.SEL tag
+            self.__defer('delete', *r); self.__flush() #delete selected text
+        self.caret = p or self.caret                   #put the caret somewhere
         return bool(r)
         
-    #move all selected text to clipboard
-    def __copy(self) -> bool:
-        r = self.tag_ranges(tk.SEL)
-        t = '\n'.join(self.get(*r[i:i+2]) for i in range(0,len(r),2))
+    #all selected text as a BoxClip, or None if it's all whitespace ~ the clipboard is never touched here
+    def __copy(self, bnd:SelectBounds=None) -> BoxClip:
+        r = self.__ranges(bnd)
+        t = self.batch((('get', *r[i:i+2]) for i in range(0,len(r),2)), self.__p)
+        #box rows are one range each, a normal selection is one range that has rows in it
+        l = list(t) if self.__boxselect else '\n'.join(t).split('\n')
         
-        if n:=len(WHITE.sub('', t)):
-            #bkup used with drag to restore the clipboard after drop
-            try               : self.__lclipbd = self.clipboard_get()
-            except tk.TclError: self.__lclipbd = ''
-            self.clipboard_clear()
-            self.clipboard_append(t)
-        return bool(n)
+        if any(map(str.strip, l)):
+            return BoxClip(l, bnd.w if (bnd:=(bnd or self.__lbounds)) and self.__boxselect else max(map(len, l)), len(l))
+        return None
 
-    #insert clipboard text
-    def __paste(self) -> bool:
-        try:
-            l = self.clipboard_get().split('\n')    #get lines
-        except tk.TclError: return False
-        
-        r,c = map(int, self.caret.split('.'))   #get caret row, col
-        #we can't go by columns due to tabs being possibly included
-        x,_,_,_ = self.bbox(self.caret)
-        #true single space character count from beginning of line to caret
-        pc = int(x//self.__fw)
-        
-        #insert each line at an incrementing row index
-        for i,t in enumerate(l):
-            p = f'{r+i}.{c}'
-            
-            #if the row doesn't exist, create it
-            if self.compare(p, '>=', 'end'): self.insert(tk.END, '\n')
-                
-            #if the column doesn't exist, create it
-            q = f'{r+i}.end'
-            if self.compare(p, '>=', q):# and i:
-                #what's the difference in available and desired columns
-                n = pc-int(self.index(q).split('.')[-1])
-                #add enough space to keep us in line, and add the text while we are at it
-                self.insert(q, f'{" "*(n)}{t}')
-                continue
-                    
-            #insert (t)ext at (p)osition
-            self.insert(p, t)
+    #insert rows (l) at (p)osition or the caret ~ (p) can be a virtual column
+    #each chunk of target rows is read in one call, merged here, and written back with one replace
+    #a job ~ yields it's progress after each chunk of rows
+    def __pasting(self, l:list, p:str=None):
+        if l is None: return False
+        
+        r,c = map(int, (p or self.caret).split('.'))   #get row, col
+        #display column to line every row up on ~ tabs, wide characters and virtual columns included
+        pc  = self.dcol(r, c)
+        
+        for k in range(0, len(l), self.chunkrows):
+            b, ls  = r+k, l[k:k+self.chunkrows]
+            n      = self.line_count
+            #rows past the end of the text are pasted after the last row
+            lo, hi = min(b, n), min(n, b+len(ls)-1)
+            m      = BoxModel(old:=self.get(f'{lo}.0', f'{hi}.end').split('\n'), lo, hi==n)
+            for cmd in m.paste(ls, (b, c), pc): self.__defer(*cmd)
+            self.__flush()
+            self.__padded(lo, old, m.lines)
+            if k+self.chunkrows<len(l): yield (k+self.chunkrows)/len(l)
         
         self.caret = f'{r}.{c}' #put the caret at the top-left of the paste
         return True
     
+    #FIND
+    #every selected column slice ~ [(row, begin col, slice, line length)], the rows of every box-selection are read in one call
+    def __slices(self) -> list:
+        if not (xs:=self.boxes): return []
+        n, out = self.line_count, []
+        for x, t in zip(xs, self.batch((('get', f'{x.br}.0', f'{min(x.er, n)}.end') for x in xs), self.__p)):
+            out += ((r, x.bc, l[x.bc:x.ec], len(l)) for r, l in enumerate(str(t).split('\n'), x.br))
+        return out
+        
+    #find (pattern) in the box-selections ~ returns how many matches there are. `find_next` goes from one to the next
+    def box_find(self, pattern:Union[str, re.Pattern], flags:int=0) -> int:
+        self.__finish()
+        rx   = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        keys, lens = array('Q'), array('I')
+        for r, c, t, _ in self.__slices():
+            for m in rx.finditer(t):
+                keys.append((r<<32)|(c+m.start()))
+                lens.append(m.end()-m.start())
+        #box-selections that share rows give their matches out of order
+        if self.__boxes and keys:
+            keys, lens = map(array, ('Q','I'), zip(*sorted(zip(keys, lens))))
+        self.__find = (rx, keys, lens)
+        return len(keys)
+        
+    #go to the next, or previous, match after the caret ~ it is tagged BOXMATCH. returns it's (begin, end), or None
+    #edits make the match index stale, it is found again the next time it is needed
+    def find_next(self, backward:bool=False) -> tuple:
+        if not (f:=self.__find): return None
+        if f[1] is None: self.box_find(f[0])
+        _, keys, lens = self.__find
+        if not keys: return None
+        r, c = map(int, self.caret.split('.'))
+        i    = (bisect_left(keys, (r<<32)|c)-1 if backward else bisect_right(keys, (r<<32)|c)) % len(keys)
+        r, c = keys[i]>>32, keys[i]&0xFFFFFFFF
+        b, e = f'{r}.{c}', f'{r}.{c+lens[i]}'
+        self.tag_move('BOXMATCH', b, e)
+        self.caret = b
+        self.see(b)
+        return b, e
+        
+    #replace (pattern) with (repl) in the box-selections ~ returns how many replacements there were
+    #the slices are matched up front, only rows that change are written back. it's one undo step, and a job when it's long
+    def box_replace(self, pattern:Union[str, re.Pattern], repl:Union[str, Callable], flags:int=0, count:int=0) -> int:
+        self.__finish()
+        rx, edits, n = re.compile(pattern, flags) if isinstance(pattern, str) else pattern, [], 0
+        for r, c, t, lc in self.__slices():
+            s, k = rx.subn(repl, t, count)
+            #a slice past the line end is padded out to it's column
+            if s!=t: edits.append((r, -c, t, ' '*max(0, c-lc)+s))
+            n += k
+        if edits:
+            #rows that have more than one box-selection are replaced from the right
+            edits.sort()
+            self.__start(OP_FIND, self.__replacing(edits), edits[0][0], edits[-1][0])
+        return n
+        
+    #a job ~ (edits) are (row, -col, old slice, new slice), chunks of them go out in one call each
+    def __replacing(self, edits:list):
+        for i in range(0, len(edits), self.chunkrows):
+            for r, c, t, s in edits[i:i+self.chunkrows]: self.__defer('replace', f'{r}.{-c}', f'{r}.{len(t)-c}', s)
+            self.__flush()
+            if i+self.chunkrows<len(edits): yield (i+self.chunkrows)/len(edits)
+        #the selected columns haven't moved, the text in them has
+        if self.__lbounds: self.__bounds_range(tk.SEL)
+        
+    #the match index goes stale with any edit, and so does the snapshot a running column transform has
+    def watch(self, cmd:str, args:tuple) -> None:
+        if cmd in EDITS:
+            if (f:=self.__find) and not (f[1] is None): self.__find = (f[0], None, None)
+            if self.__xform: self.__xformcancel()
+            #an edit that isn't a box edit can move rows and columns ~ what box edits added is no longer known
+            if not self.__tx: self.__pads, self.__grown = {}, None
+        Textra.watch(self, cmd, args)
+        
+    #COLUMN TRANSFORMS
+    #the box-selection's rows are read in one call, transformed in (pool) off the tk loop, and the script comes back as one job and one undo step
+    #(pool) is a thread pool unless one is given ~ a process pool needs a module-level (f) or (key). `done(bounds)` is called once it's applied
+    #any edit before then, or Escape, cancels it. returns the future, or None without a box-selection
+    
+    #the cells become f(cells, *args) ~ ex: `box_transform(align_cells, ',')`, `box_transform(case_cells, 'lower')`
+    def box_transform(self, f:Callable, *args, pool:Executor=None, done:Callable=None) -> Future:
+        return self.__xformstart('transform', (f, *args), pool, done)
+        
+    #sort the rows by the selected column ~ ex: `box_sort(number_key)`
+    def box_sort(self, key:Callable=None, reverse:bool=False, pool:Executor=None, done:Callable=None) -> Future:
+        return self.__xformstart('sort', (key, reverse), pool, done)
+        
+    def __xformstart(self, name:str, args:tuple, pool:Executor, done:Callable) -> Future:
+        self.__finish()
+        self.__xformcancel()
+        if not (self.__boxselect and (bnd:=self.__lbounds)): return None
+        n      = self.line_count
+        lo, hi = bnd.br, min(bnd.er, n)
+        f      = (pool or transform_pool()).submit(box_work, self.get(f'{lo}.0', f'{hi}.end').split('\n'), lo, hi==n, name, bnd, *args)
+        self.__xform = (f, done)
+        self.__xformpoll()
+        return f
+        
+    #the transform is done ~ it's script is replayed as a job
+    def __xformpoll(self) -> None:
+        self.__xformid = None
+        if not (x:=self.__xform): return
+        if not x[0].done(): 
+            self.__xformid = self.after(XFORMMS, self.__xformpoll)
+            return
+        self.__xform = None
+        #a transform that failed raises here, like any other callback
+        script, bnd = x[0].result()
+        self.__start(OP_XFORM, self.__transforming(script, bnd, x[1]), bnd.br, bnd.er)
+        
+    def __xformcancel(self) -> None:
+        if not (self.__xformid is None): self.after_cancel(self.__xformid)
+        self.__xformid = None
+        if x:=self.__xform:
+            self.__xform = None
+            x[0].cancel()
+            if self.progress: self.progress(OP_XFORM, None)
+        
+    #a job ~ chunks of (script) go out in one call each, then the box-selection becomes (bnd)
+    def __transforming(self, script:list, bnd:SelectBounds, done:Callable):
+        for i in range(0, len(script), self.chunkrows):
+            for cmd in script[i:i+self.chunkrows]: self.__defer(*cmd)
+            self.__flush()
+            if i+self.chunkrows<len(script): yield (i+self.chunkrows)/len(script)
+        if self.__boxselect:
+            self.__lbounds = self.__bounds(f'{bnd.br}.{bnd.bc}', f'{bnd.er}.{bnd.ec}', ow=True, dn=bnd.dn, rt=bnd.rt)
+            self.__bounds_range(tk.SEL)
+        if done: done(bnd)
+        
+    #JOBS THAT SPAN SEVERAL EDITS
+    #BOXSELECT CUT(Cntl+x)
+    def __cutbox(self):
+        if clip:=self.__copy(): self.__clipclaim(clip)
+        self.__cut()
+        self.__boxreset()
+        yield from ()
+        
+    #BOXSELECT PASTE(Cntl+v) ~ every box-selection is cut, and the rows go in once, at the top-left of the one the caret is in
+    #boxes left of it on it's first row take their cells with them, so it's column is where the cut leaves it
+    def __pastebox(self, l:list):
+        if b:=self.__lbounds:
+            s = self.get(f'{b.br}.0', f'{b.br}.end')
+            c = b.bc-sum(len(s[x.bc:x.ec]) for x in self.__boxes.within(b.br, b.br) if x.ec<=b.bc)
+        self.__cut() #if any
+        #set caret to begin position
+        if b: self.caret = f'{b.br}.{c}'
+        yield from self.__pasting(l)
+        self.__boxreset()
+        
+    #move the box-selection (bnd) to top-left (p)osition in place ~ it does what cut and paste would, minus the round trips between them
+    #what it takes, and the display column it lands on once it's cut, are read first. then each window of rows it leaves or lands on is read in one call,
+    #cut and pasted by the model, and it's script goes out in one call. a job ~ yields it's progress after each window, `__start` puts the rows back if it's cancelled
+    def __moving(self, bnd:SelectBounds, p:tuple):
+        self.__blinkreset()
+        (r, c), n = p, self.line_count
+        clip      = [x[bnd.bc:bnd.ec] for lo, hi in self.__windows(((bnd.br, bnd.er),)) for x in self.get(f'{lo}.0', f'{hi}.end').split('\n')]
+        clip      = clip if bnd.w and any(map(str.strip, clip)) else []
+        s         = self.get(f'{r}.0', f'{r}.end') if r<=n else ''
+        pc        = display_col(column_map(s[:bnd.bc]+s[bnd.ec:] if bnd.br<=r<=bnd.er else s), c)
+        #rows past the end of the text are pasted with the last row
+        e         = r+len(clip)-1
+        wins      = self.__windows([(bnd.br, bnd.er)]+([(r, e)] if clip else [])+([(n, n)] if clip and r>n else []))
+        for i, (lo, hi) in enumerate(wins):
+            eof = hi==n
+            m   = BoxModel(old:=self.get(f'{lo}.0', f'{hi}.end').split('\n'), lo, eof)
+            if (bnd.br<=hi) and (lo<=bnd.er): 
+                for cmd in m.cut(BoxModel.bounds((max(bnd.br, lo), bnd.bc), (min(bnd.er, hi), bnd.ec))): self.__defer(*cmd)
+            if (a:=max(r, lo))<=(z:=e if eof else min(e, hi)):
+                for cmd in m.paste(clip[a-r:z-r+1], (a, c), pc): self.__defer(*cmd)
+            self.__flush()
+            self.__padded(lo, old, m.lines)
+            if i+1<len(wins): yield (i+1)/len(wins)
+        self.caret = p = f'{r}.{c}'
+        
+        self.__boxmove(False, p)
+        self.__bounds_range(tk.SEL)
+        self.__blink(False)
+        
+    #Shift+Arrow repeats come faster than frames ~ they add up to one move, made with the next frame
+    def __nudged(self) -> None:
+        p, self.__nudge = self.__nudge, None
+        if p and self.__boxselect and (bnd:=self.__lbounds) and (p != (bnd.br, bnd.bc)):
+            self.__start(OP_MOVE, self.__moving(bnd, p), min(bnd.br, p[0]), max(bnd.er, p[0]+bnd.h))
+        
+    #drop the grabbed (s)elect (b)ounds at (bnd) ~ it's a move, to where the text it was dropped on is once the grabbed box is cut
+    def __dropping(self, sb:SelectBounds, bnd:SelectBounds):
+        r, c = bnd.br, bnd.bc
+        if (sb.br<=r<=sb.er) and (c>sb.bc): c -= min(c, sb.ec)-sb.bc
+        yield from self.__moving(sb, (r, c))
+    
     #EVENTS
+    #what an event sends is counted against the op it sets ~ the op goes back to what it was once the event is handled
     def __handler(self, event) -> None:
+        op = self.__op
+        try    : return self.__handle(event)
+        finally: self.__op = op
+        
+    def __handle(self, event) -> None:
         #Shift and Alt facts
         shift = (event.keysym in SHIFTS) or (event.state & SHIFT)
         alt   = (event.keysym in ALTS  ) or (event.state & ALT  )
         shiftonly, altonly = (shift and not alt), (alt and not shift)
+        self.__op = OP_DROP if self.__selgrab else OP_EVENT
+        
+        #a column transform is still running ~ Escape drops it
+        if self.__xform and (event.type == tk.EventType.KeyPress) and (event.keysym == 'Escape'):
+            self.__xformcancel()
+            return 'break'
         
-        self.set_activeline()
+        #a long box edit is still running ~ Escape takes it back, anything else waits for it to finish
+        if self.__job and (event.type in (tk.EventType.KeyPress, tk.EventType.ButtonPress, tk.EventType.ButtonRelease)):
+            if (event.type == tk.EventType.KeyPress) and (event.keysym == 'Escape'):
+                self.__cancel()
+                return 'break'
+            self.__finish()
+        
+        #box-select keypresses are coalesced into frames, everything else needs the box to be current
+        #so are Shift+Arrow moves
+        nudge = (event.type == tk.EventType.KeyPress) and (event.keysym in ARROWS) and shiftonly and self.__boxselect
+        if not ((self.__as or nudge) and event.type == tk.EventType.KeyPress): self.__sync()
+        self.__schedule(R_LINE)
         
         if event.type == tk.EventType.KeyPress:
             self.__as = alt and shift
                             
-            if event.state & CONTROL:
+            if (event.state & CONTROL) and not self.__as:
                 if   event.keysym=='c':
                     #if not boxcopy, normal cut/copy/paste behaviors are used
                     self.__boxcopy = not self.__as_commit and self.__boxselect
                     
                     #BOXSELECT COPY(Cntl+c)
                     if self.__boxcopy:
-                        self.__copy()
+                        self.__op = OP_CLIP
+                        if clip:=self.__copy(): self.__clipclaim(clip)
                         return 'break'
                         
                 elif event.keysym=='x':
@@ -532,27 +2177,26 @@ class BoxSelectText(Textra):
                     
                     #BOXSELECT CUT(Cntl+x)
                     if self.__boxcopy:
-                        self.__copy()
-                        self.__cut()
-                        self.__boxreset()  
+                        self.__op = OP_CLIP
+                        self.__start(OP_CLIP, self.__cutbox(), *self.__extent())
                         return 'break'
                           
                 elif event.keysym=='v':
                     #BOXSELECT PASTE(Cntl+v)
                     if self.__boxcopy:
-                        self.__cut() #if any
-                        #set caret to begin position
-                        if b:=self.__lbounds: self.caret = f'{b.br}.{b.bc}'
-                        self.__paste()
-                        self.__boxreset()    
+                        self.__op = OP_PASTE
+                        r = b.br if (b:=self.__lbounds) else int(self.caret.split('.')[0])
+                        l = self.__clipboard()
+                        #the rows of every box-selection it cuts, and the rows it pastes
+                        lo, hi = self.__extent() if b else (r, r)
+                        self.__start(OP_PASTE, self.__pastebox(l), lo, max(hi, r+len(l or ())-1))
                         return 'break'
                 return
 
             elif event.keysym=='BackSpace':
                 #BOXSELECT BackSpace
                 if self.__boxselect:
-                    for r,c,adv in self.__typing_range(-1):
-                        if adv<0: self.delete(f'{r}.{c}', f'{r}.{c+abs(adv)}')
+                    self.__type()
                     return 'break'    
                 return
                 
@@ -561,40 +2205,33 @@ class BoxSelectText(Textra):
                 if self.__boxselect:
                     if bnd:=self.__lbounds:
                         self.tag_move(tk.SEL)
-                        _,c = map(int, self.caret.split('.'))
+                        c = (bnd.bc, bnd.ec)[bnd.rt] #the caret column might be virtual
                         self.__lbounds = self.__bounds(f'{bnd.br}.{c}', f'{bnd.er}.{c}', bnd.dn, bnd.rt, ow=True)
+                        self.__drawn   = set()
+                        #so do the others
+                        if self.__boxes:
+                            self.__boxes  = BoxIndex(self.__bounds(f'{x.br}.{c}', f'{x.er}.{c}', x.dn, x.rt) for x in self.__boxes for c in ((x.bc, x.ec)[x.rt],))
+                            self.__xdrawn = set()
+                            self.__schedule(R_VIEW)
                     return 'break'
             
             #Shift+Arrow while in box-select mode moves entire selection in Arrow direction
             elif event.keysym in ARROWS and shiftonly and self.__boxselect:
                 if not (bnd:=self.__lbounds): return
                 
-                self.__blinkreset()
-                #multiline-caret
-                mc = self.__bounds(f'{bnd.br}.{bnd.bc}', f'{bnd.er}.{bnd.bc}', ow=False)
-                #track any effect a deletion has on our drop index
-                self.mark_set(INSPNT, f'{bnd.br}.{bnd.bc}')
-                
-                cpy = self.__copy()
-                    
-                self.__cut(INSPNT)     
-                self.__boxclean(mc)
-                self.__aindex(event.keysym) #move caret in arrow direction
-                
-                if cpy:
-                    self.__paste()
-                    self.__restore_clipboard()
-                    
-                bnd = self.__boxmove(False)
-                for _,_,_ in self.__bounds_range(tk.SEL, eo=not bnd.rt, ao=True): pass
-                self.__blink(False)
-                
+                self.__op = OP_MOVE
+                self.__boxsingle()
+                #from where the repeats before this one took it
+                r, c   = self.__nudge or (bnd.br, bnd.bc)
+                dr, dc = next(v for k, v in self.__arrows.items() if k in event.keysym)
+                self.__nudge = (max(1, r+dr), max(0, c+dc))
+                self.__schedule(R_MOVE)
                 return 'break'
                     
             #deselects and moves caret to the start(left) or end(right) of the former selection
             #works for any type of selection
             elif (event.keysym in HARROWS) and (not self.__as):
-                if b:= self.__bounds(*self.tag_bounds(tk.SEL)):
+                if b:= (self.__boxselect and self.__lbounds) or self.__bounds(*self.tag_bounds(tk.SEL)):
                     self.__boxreset()
                     self.caret = f'{b.er}.{b.ec}' if 'Right' in event.keysym else f'{b.br}.{b.bc}'
                     return 'break'
@@ -625,20 +2262,10 @@ class BoxSelectText(Textra):
                     
                     #box-select mousemove ~ via last keypress (shift, alt, arrow) constantly firing
                     #vindex might not exist yet.
-                    self.__boxend = (self.__aindex(event.keysym), self.__vindex(event.x, event.y))[self.__as_mouse]
+                    self.__boxend = (self.__aindex(event.keysym, self.__boxend), self.__vindex(event.x, event.y))[self.__as_mouse]
                     
-                    #never use overwrite here, if you do you will lose the proper selection direction
-                    if (bnd:=self.__bounds(ow=False)) == self.__lbounds: return
-                        
-                    #remove whitespace and carets from last bounds, overwrite last bounds 
-                    self.__boxclean()
-                    self.__lbounds = bnd
-                    
-                    #draw rect
-                    for r, bc, ec in self.__bounds_range('BOXSELECT', bo=not bnd.rt, eo=1):
-                        _, lc = map(int, self.index(f'{r}.end').split('.'))
-                        self.insert(f'{r}.{ec}', ' '*max(0, ec-lc)) #add columns if necessary
-                        
+                    #drawn with the next frame ~ box ends in between are dropped
+                    self.__schedule(R_BOX)
                     return 'break'
                         
                 #box-select mouseup ~ deinit hotbox 
@@ -650,10 +2277,9 @@ class BoxSelectText(Textra):
                 self.__linsert  = self.caret
                 return 'break'
             else:
-                #BOX-TYPING
+                #BOX-TYPING ~ Escape, Delete and any other key that isn't text never gets typed on every row
                 if self.__boxselect and len(event.char):
-                    #typing_range handles the faux-caret and bounds management, we just need to insert
-                    for r,c,adv in self.__typing_range(1): self.insert(f'{r}.{c-adv}', event.char)  
+                    if (event.char == '\t') or event.char.isprintable(): self.__type(event.char)
                     return 'break'
                             
         elif event.type == tk.EventType.KeyRelease:
@@ -673,13 +2299,21 @@ class BoxSelectText(Textra):
             
         elif event.type == tk.EventType.ButtonPress:
             mse  = self.index('current') #get mouse index
+            r,c  = map(int, mse.split('.'))
             
+            #check if mouse index is within a selection ~ box-selections are found by their bounds
+            grab = self.__boxat(r, c) if self.__boxselect else (tk.SEL in self.tag_names(mse))
+            
+            #ADD BOX(Ctrl+Alt+Shift)
+            if self.__boxselect and self.__as and (event.state & CONTROL) and not grab:
+                self.__boxpush(self.__vindex(event.x, event.y))
+                
             #GRAB SELECTED
-            #check if mouse index is within a selection
-            if tk.SEL in self.tag_names(mse):
-                #box-selection
+            elif grab:
+                self.__op = OP_DROP
+                #box-selection ~ only the grabbed one is dragged
+                if self.__boxselect: self.__boxsingle(grab)
                 if b:=self.__lbounds:
-                    r,_ = map(int, mse.split('.')) #get mouse index row
                     self.__vgrabofs = b.br-r       #store vertical grab offset
                 #normal selection
                 else:
@@ -720,42 +2354,226 @@ class BoxSelectText(Textra):
             self.__seldrag = False
             self.tag_replace('BOXSELECT', tk.SEL)
             
-            #make a "multiline caret" so __boxclean works down every row... 
-            #in what will be the only remaining column, after deletion
-            mc = None
-            if self.__boxselect:
-                mc = self.__bounds(*self.tag_bounds(tk.SEL), ow=False)
-                mc = self.__bounds(f'{mc.br}.{mc.bc}', f'{mc.er}.{mc.bc}', ow=False)
+            sb = self.__lbounds #grabbed bounds
             
             #DROP SELECTED                                  
             if bnd:=self.__boxmove(): # move bounds to current location
+                #PASTE COLUMN ~ from the copy on, so a cancel puts the grabbed rows back too
+                if self.__boxselect:
+                    self.__start(OP_DROP, self.__dropping(sb, bnd), min(sb.br, bnd.br), max(sb.er, bnd.er))
+                    return
+                    
                 #COPY
-                self.__copy()
+                clip = self.__copy(sb)
                 
                 #CUT
                 #this tracks any effect a deletion has on where we are trying to drop this
-                self.mark_set(INSPNT, (self.caret, f'{bnd.br}.{bnd.bc}')[self.__boxselect])
-                self.__cut(INSPNT)     #delete selection and move caret to insertion point
+                self.mark_set(INSPNT, self.caret)
+                self.__cut(INSPNT, sb) #delete selection and move caret to insertion point
                 
                 #PASTE NORMAL
-                if not self.__boxselect:
-                    ip = self.caret
-                    self.event_generate('<<Paste>>')
-                    self.__lbounds = self.__bounds(ip, self.caret, ow=True)
-                    self.set_activeline()
-                    self.tag_move(tk.SEL, ip, self.caret) #clear and draw tk.SEL
-                    return 
-                
-                #PASTE COLUMN 
-                self.__boxclean(mc)
-                self.__paste()
-                self.__restore_clipboard()
-                bnd = self.__boxmove(False) #move bounds to caret
-                #draw rect
-                for _,_,_ in self.__bounds_range(tk.SEL, eo=not bnd.rt, ao=True): pass
-                self.__blink()
+                ip = self.caret
+                if clip: self.insert(tk.INSERT, '\n'.join(clip.rows))
+                self.__lbounds = self.__bounds(ip, self.caret, ow=True)
+                self.set_activeline()
+                self.tag_move(tk.SEL, ip, self.caret) #clear and draw tk.SEL
                             
 
+#PIECE TABLE
+#a document over a memory-mapped file that is never loaded or changed ~ edits are pieces of added lines between pieces of file lines
+#rows are 1-based like the text widget, columns are character columns like `SelectBounds`
+class PieceTable:
+    def __init__(self, path:str, encoding:str='utf-8'):
+        self.path, self.encoding = path, encoding
+        self.__f = open(path, 'rb')
+        self.__m = mmap.mmap(self.__f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(self.__f.fileno()).st_size else b''
+        
+        #line breaks before the start of every block of the file ~ one pass that counts, nothing is kept
+        self.__marks, n = array('Q', (0,)), 0
+        for k in range(0, len(self.__m), PIECEBLOCK):
+            n += self.__m[k:k+PIECEBLOCK].count(b'\n')
+            self.__marks.append(n)
+        self.__lines = n+1
+        
+        #[source, first line, lines] ~ file lines have no source, added lines are their own list
+        self.__pieces = [[None, 0, self.__lines]]
+        self.__ends   = array('Q', (self.__lines,)) #rows up to the end of each piece
+        
+    @property
+    def line_count(self) -> int: return self.__ends[-1] if self.__ends else 0
+    
+    #byte offset of file line `i` ~ 0-based. past the last line is one past the end of the file
+    def __offset(self, i:int) -> int:
+        if i<=0             : return 0
+        if i>=self.__lines  : return len(self.__m)+1
+        #the block that holds the `i`th line break, then walk to it
+        k = bisect_left(self.__marks, i)-1
+        p = k*PIECEBLOCK-1
+        for _ in range(i-self.__marks[k]): p = self.__m.find(b'\n', p+1)
+        return p+1
+        
+    #file lines `i` to `j` ~ 0-based, `j` excluded. a CRLF line break is only a line break, on the last line too
+    def __file(self, i:int, j:int) -> list:
+        if i>=j: return []
+        return [l[:-1] if l.endswith('\r') else l for l in self.__m[self.__offset(i):self.__offset(j)-1].decode(self.encoding, 'replace').split('\n')]
+        
+    #rows `b` to `e` as a list of strings
+    def lines(self, b:int, e:int) -> list:
+        out, r = [], max(1, b)-1
+        i = bisect_right(self.__ends, r)
+        while r<e and i<len(self.__pieces):
+            src, a, n = self.__pieces[i]
+            s = self.__ends[i-1] if i else 0
+            j, k = r-s, min(n, e-s)
+            out += self.__file(a+j, a+k) if src is None else src[a+j:a+k]
+            r, i = s+k, i+1
+        return out
+        
+    def line(self, r:int) -> str: return (self.lines(r, r) or ('',))[0]
+        
+    #make a piece start at row index `r` ~ 0-based. returns the index of that piece
+    def __split(self, r:int) -> int:
+        if (i:=bisect_right(self.__ends, r)) >= len(self.__pieces): return len(self.__pieces)
+        if r == (s:=self.__ends[i-1] if i else 0): return i
+        src, a, n = self.__pieces[i]
+        self.__pieces[i:i+1] = [[src, a, r-s], [src, a+r-s, n-r+s]]
+        self.__ends.insert(i, r)
+        return i+1
+        
+    #replace rows `b` to `e` with `new` lines ~ `e=b-1` inserts before row `b`
+    def replace_lines(self, b:int, e:int, new:list) -> None:
+        i = self.__split(max(1, b)-1)
+        j = self.__split(max(b-1, min(e, self.line_count)))
+        self.__pieces[i:j] = [[list(new), 0, len(new)]] if new else []
+        #the document always has a row
+        if not self.__pieces: self.__pieces = [[[''], 0, 1]]
+        self.__ends = array('Q', itertools.accumulate(n for _,_,n in self.__pieces))
+        
+    #BOX
+    #the text of every row of box-selection `bnd`
+    def box_text(self, bnd:SelectBounds) -> list:
+        return [l[bnd.bc:bnd.ec] for l in self.lines(bnd.br, bnd.er)]
+        
+    #replace the columns of box-selection `bnd` with `rows` ~ one string for every row, or the same string on all of them
+    #short rows are padded up to the box, but never for nothing. rows past the end are created. done `PIECECHUNK` rows at a time
+    #if `rows` runs out first, the rest of the box's rows stay as they are ~ and the ones past the end aren't created
+    def box_replace(self, bnd:SelectBounds, rows:Any) -> None:
+        it, t = itertools.repeat(rows) if isinstance(rows, str) else iter(rows), ''
+        #rows between the end and the box are created empty
+        if (n:=self.line_count) < bnd.br-1: self.replace_lines(n+1, n, ['']*(bnd.br-1-n))
+        for b in range(bnd.br, bnd.er+1, PIECECHUNK):
+            e, new = min(bnd.er, b+PIECECHUNK-1), []
+            old    = self.lines(b, e)
+            for k, l in enumerate(old+['']*(e-b+1-len(old))):
+                if (t:=next(it, None)) is None:
+                    new += old[k:]
+                    break
+                if t and len(l)<bnd.bc: l = l.ljust(bnd.bc)
+                new.append(f'{l[:bnd.bc]}{t}{l[bnd.ec:]}')
+            self.replace_lines(b, b+len(old)-1, new)
+            if t is None: break
+            
+    #FILE
+    #write the document to `path` ~ file pieces are copied as bytes, a block at a time
+    def save(self, path:str=None) -> None:
+        path = os.path.abspath(path or self.path)
+        tmp  = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            for n, (src, a, k) in enumerate(self.__pieces):
+                if n: f.write(b'\n')
+                if src is None:
+                    for p in range(self.__offset(a), e:=self.__offset(a+k)-1, PIECEBLOCK): f.write(self.__m[p:min(p+PIECEBLOCK, e)])
+                else: f.write('\n'.join(src[a:a+k]).encode(self.encoding))
+        #the file this is mapped from can only be replaced once it is let go
+        if same:=(path == os.path.abspath(self.path)): self.close()
+        os.replace(tmp, path)
+        if same: self.__init__(path, self.encoding)
+        
+    def close(self) -> None:
+        if isinstance(self.__m, mmap.mmap): self.__m.close()
+        self.__f.close()
+        
+        
+#DOCUMENT WINDOW
+#show a sliding window of `size` rows of a `PieceTable` in a text widget ~ the window slides as the view nears one of it's edges
+#edits made in the widget go back to the table before it slides. `yscroll` gets the view as fractions of the whole document
+class DocumentWindow:
+    def __init__(self, widget:Textra, table:PieceTable, size:int=WINDOWROWS, yscroll:Callable=None):
+        self.widget, self.table, self.size = widget, table, size
+        self.yscroll  = yscroll
+        self.top      = 1     #document row of the first widget row
+        self.__shown  = ''    #text of the window as it was shown
+        self.__rows   = 0     #document rows in the window
+        self.__slide  = False #the window is moving
+        widget.configure(yscrollcommand=self.__yscroll)
+        self.show(1)
+        
+    #document rows <-> widget rows
+    def doc_row(self, r:int) -> int: return r+self.top-1
+    def widget_row(self, r:int) -> int: return r-self.top+1
+    
+    #box-selection `bnd` of the widget in document rows
+    def doc_bounds(self, bnd:SelectBounds) -> SelectBounds:
+        return bnd._replace(br=self.doc_row(bnd.br), er=self.doc_row(bnd.er))
+    
+    #put the window's edits in the table
+    def commit(self) -> None:
+        if (t:=self.widget.text) != self.__shown:
+            self.table.replace_lines(self.top, self.top+self.__rows-1, t.split('\n'))
+            self.__shown, self.__rows = t, t.count('\n')+1
+            
+    #show the window that starts on document row `top` ~ after putting the window's edits in the table, if `commit`
+    def show(self, top:int, commit:bool=True) -> None:
+        if commit: self.commit()
+        self.top    = max(1, min(top, self.table.line_count-self.size+1))
+        lines       = self.table.lines(self.top, self.top+self.size-1)
+        #setting the text isn't recorded for undo, it resets the history ~ an undo can't bring back another window's rows
+        self.widget.text = self.__shown = '\n'.join(lines)
+        self.__rows = len(lines)
+        
+    #scroll so document row `r` is at the top of the view
+    def see(self, r:int) -> None:
+        if not (self.top <= r < self.top+self.__rows): self.show(r-self.size//2)
+        self.widget.yview_moveto((self.widget_row(r)-1)/max(1, self.__rows))
+        
+    #BOX ~ in document rows, the window is kept in step
+    def box_text(self, bnd:SelectBounds) -> list:
+        self.commit()
+        return self.table.box_text(bnd)
+        
+    def box_replace(self, bnd:SelectBounds, rows:Any) -> None:
+        self.commit()
+        self.table.box_replace(bnd, rows)
+        self.show(self.top, False)
+        
+    def save(self, path:str=None) -> None:
+        self.commit()
+        self.table.save(path)
+        
+    #the widget has rows it holds on to ~ a selection, a grabbed selection, a box-selection or multiline-caret, or a box job
+    def __held(self) -> bool:
+        w = self.widget
+        if w.tag_nextrange(tk.SEL, '1.0') or w.tag_nextrange('BOXSELECT', '1.0'): return True
+        return isinstance(w, BoxSelectText) and bool(w.boxes or w.busy)
+        
+    def __yscroll(self, first:str, last:str) -> None:
+        first, last = float(first), float(last)
+        #never slide under a selection ~ it's rows would change
+        if not (self.__slide or self.__held()):
+            up   = (first<WINDOWEDGE) and (self.top>1)
+            down = (last>1-WINDOWEDGE) and (self.top+self.__rows-1 < self.table.line_count)
+            if up or down:
+                self.__slide = True
+                r = self.doc_row(int(self.widget.index('@0,0').split('.')[0]))
+                self.show(r-self.size//2)
+                self.widget.yview_moveto((self.widget_row(r)-1)/max(1, self.__rows))
+                self.__slide = False
+                return
+        if self.yscroll:
+            n = max(1, self.table.line_count)
+            self.yscroll((self.top-1+first*self.__rows)/n, (self.top-1+last*self.__rows)/n)
+
+
 #example 
 if __name__ == '__main__':
     ROWS = 6
@@ -0,0 +1,216 @@
+import tkinter as tk
+import pytest
+from boxselect import BoxModel, BoxIndex, PieceTable, Textra, row_diff, column_map, display_col, char_col, TABS
+
+B = BoxModel.bounds
+
+
+#run a BoxModel script on (text) the way the widget would ~ 'row.col' and 'row.end' indexes, clamped like tk clamps them
+def play(text:str, script:list) -> str:
+    def off(i:str) -> int:
+        l    = text.split('\n')
+        r, c = i.split('.')
+        #past the last row is the end of the last row
+        if int(r)>len(l): r, c = len(l), 'end'
+        r    = int(r)-1
+        c    = len(l[r]) if c=='end' else min(int(c), len(l[r]))
+        return sum(len(s)+1 for s in l[:r])+c
+    for cmd, i, *x in script:
+        if cmd=='insert':
+            o    = off(i)
+            text = text[:o]+x[0]+text[o:]
+        else:
+            a, z = off(i), off(x[0])
+            text = text[:a]+(x[1] if cmd=='replace' else '')+text[z:]
+    return text
+
+#(name) on a model of (text) ~ the script must do to the text what the model did to it's lines
+def edit(text:str, name:str, *args) -> BoxModel:
+    m   = BoxModel.from_text(text)
+    out = getattr(m, name)(*args)
+    assert play(text, out[0] if isinstance(out, tuple) else out) == m.text
+    return m, out
+
+
+#BOX MODEL
+def test_type():
+    m, (_, x) = edit('abcd\nefgh\nij', 'type', B((1,1), (3,3)), 'X')
+    assert m.text == 'aXd\neXh\niX'
+    assert (x.br, x.er, x.bc, x.w) == (1, 3, 2, 0)
+
+def test_type_multiline_caret_pads_short_rows():
+    m, _ = edit('abc\n\nabc', 'type', B((1,2), (3,2)), '|')
+    assert m.text == 'ab|c\n  |\nab|c'
+
+def test_backspace():
+    m, (_, x) = edit('abc\nabc\nabc', 'backspace', B((1,2), (3,2)))
+    assert m.text == 'ac\nac\nac'
+    assert x.bc == 1
+    #nothing left of the first column
+    m, (_, x) = edit('abc', 'backspace', B((1,0), (1,0)))
+    assert (m.text, x.bc) == ('abc', 0)
+
+def test_typing_shared_rows():
+    #boxes on the same row edit it from the right, so the columns on the left still hold
+    m, (_, out) = edit('abcdef', 'typing', (B((1,0), (1,1)), B((1,3), (1,5))), '-')
+    assert m.text == '-bc-f'
+    assert [x.bc for x, in out] == [1, 4]
+
+def test_cut():
+    m, _ = edit('abcd\nefgh\nij', 'cut', B((1,1), (3,3)))
+    assert m.text == 'ad\neh\ni'
+
+def test_copy():
+    m = BoxModel.from_text('abcd\nefgh\nij')
+    assert m.copy(B((1,1), (3,3))).rows == ['bc', 'fg', 'j']
+    assert m.copy(B((1,1), (2,1))) is None
+    assert BoxModel.from_text('a  b').copy(B((1,1), (1,3))) is None
+
+def test_paste():
+    m, _ = edit('ab\nab', 'paste', ['X', 'Y'], (1, 1))
+    assert m.text == 'aXb\naYb'
+    #past the end of a row, and past the end of the text
+    m, _ = edit('ab', 'paste', ['X', 'Y'], (1, 4))
+    assert m.text == 'ab  X\n    Y'
+
+def test_paste_lines_up_on_display_columns():
+    m, _ = edit(f'\tb\n{(s:="abcdefghij")}', 'paste', ['X', 'Y'], (1, 1))
+    assert m.text == f'\tXb\n{s[:TABS]}Y{s[TABS:]}'
+
+def test_clean():
+    m, _ = edit('ab  \n   \nab  ', 'clean', B((1,0), (3,2)))
+    assert m.text == 'ab\n\nab'
+    #blank rows at the end of the text go
+    m, _ = edit('ab\n  \n ', 'clean', B((2,0), (3,2)))
+    assert m.text == 'ab'
+
+def test_move():
+    m, (_, x) = edit('abcd\nefgh', 'move', B((1,1), (2,2)), (1, 2))
+    assert m.text == 'acbd\negfh'
+    assert (x.br, x.bc, x.er, x.ec) == (1, 2, 2, 3)
+
+def test_move_keeps_whitespace():
+    #what was there before the move is the user's ~ moving doesn't clean it
+    m, _ = edit('ab  ', 'move', B((1,0), (1,1)), (1, 1))
+    assert m.text == 'ba  '
+
+def test_move_past_the_end():
+    m, _ = edit('ab', 'move', B((1,0), (1,1)), (3, 0))
+    assert m.text == 'b\n\na'
+
+def test_unpad():
+    #whitespace box edits added goes, the user's stays ~ rows added at the end go too
+    m, _ = edit('ab   \ncd \n\n', 'unpad', {1:1, 2:0, 3:0, 4:0}, 3)
+    assert m.text == 'ab \ncd'
+
+def test_transform_and_sort():
+    m, (_, x) = edit('ab\ncd', 'transform', B((1,0), (2,1)), lambda cells: [c.upper()*2 for c in cells])
+    assert (m.text, x.w) == ('AAb\nCCd', 2)
+    m, _ = edit('b1\na2\nc3', 'sort', B((1,0), (3,1)))
+    assert m.text == 'a2\nb1\nc3'
+
+def test_window_rows():
+    #a window further down only scripts it's own rows
+    m = BoxModel(['ab', 'cd'], 5, False)
+    assert m.type(B((5,1), (6,1)), 'X')[0] == [('insert', '5.1', 'X'), ('insert', '6.1', 'X')]
+
+
+#ROW DIFF AND DISPLAY COLUMNS
+@pytest.mark.parametrize('o, t, out', [
+    ('abc'   , 'abc'   , (3, ''  , ''  )),
+    ('abc'   , 'aXc'   , (1, 'b' , 'X' )),
+    ('abc'   , 'abXc'  , (2, ''  , 'X' )),
+    ('abcabc', 'abc'   , (3, 'abc', '' )),
+    (''      , 'ab'    , (0, ''  , 'ab')),
+    ('aa'    , 'aaa'   , (2, ''  , 'a' )),
+])
+def test_row_diff(o, t, out):
+    assert row_diff(o, t) == out
+    p, a, z = out
+    assert o[:p]+z+o[p+len(a):] == t
+
+def test_column_map():
+    assert column_map('abc') == 3
+    m = column_map('a\tb一c')
+    assert list(m) == [0, 1, TABS, TABS+1, TABS+3, TABS+4]
+    assert display_col(m, 2) == TABS and display_col(m, 7) == TABS+6
+    assert char_col(m, 3) == 1 and char_col(m, 3, True) == 2
+    assert display_col(5, 9) == char_col(5, 9) == 9
+
+
+#BOX INDEX
+def test_box_index():
+    xs = [B((1,0), (9,2)), B((3,4), (4,6)), B((3,8), (3,9)), B((6,4), (7,6))]
+    ix = BoxIndex(reversed(xs))
+    assert list(ix) == xs and ix.span == (1, 9)
+    assert ix.within(5, 5) == [xs[0]]
+    assert ix.within(3, 6) == xs
+    assert ix.at(3, 8) == xs[2] and ix.at(3, 7) is None
+    assert ix.overlaps(B((4,5), (6,5))) == [xs[1], xs[3]]
+    ix.remove(xs[0])
+    assert ix.within(8, 9) == [] and ix.span == (3, 7)
+    ix.add(B((3,0), (3,1)))
+    assert [x.bc for x in ix.within(3, 3)] == [0, 4, 8]
+    ix.clear()
+    assert not len(ix) and ix.span is None
+
+
+#PIECE TABLE
+@pytest.fixture
+def doc(tmp_path):
+    def make(data:bytes):
+        (p:=tmp_path/'doc.txt').write_bytes(data)
+        return p, PieceTable(str(p))
+    yield make
+
+@pytest.mark.parametrize('data', [b'', b'a', b'a\nb', b'a\nb\n', b'a\r\nb\r\n', b'a\r\nb', b'\n\n'])
+def test_piece_table_round_trip(doc, tmp_path, data):
+    p, t = doc(data)
+    assert t.line_count == data.count(b'\n')+1
+    assert t.lines(1, t.line_count) == data.decode().replace('\r\n', '\n').split('\n')
+    t.save(str(out:=tmp_path/'out.txt'))
+    assert out.read_bytes() == data
+    t.close()
+
+def test_piece_table_save_in_place(doc):
+    p, t = doc(b'a\r\nb\r\nc\n')
+    t.replace_lines(2, 2, ['B', 'BB'])
+    assert t.lines(1, 9) == ['a', 'B', 'BB', 'c', '']
+    t.save()
+    #file lines keep their line breaks, the table reads the new file
+    assert p.read_bytes() == b'a\r\nB\nBB\nc\n'
+    assert t.lines(1, 9) == ['a', 'B', 'BB', 'c', '']
+    t.close()
+
+def test_piece_table_box_replace(doc):
+    p, t = doc(b'abcd\nab\nabcd')
+    t.box_replace(B((1,1), (4,3)), 'XY')
+    assert t.lines(1, 9) == ['aXYd', 'aXY', 'aXYd', ' XY']
+    t.close()
+
+def test_piece_table_box_replace_short_rows(doc):
+    #rows the box has no text for stay as they are ~ none are lost
+    p, t = doc(b'1\n2\n3\n4')
+    t.box_replace(B((1,0), (4,1)), ['a', 'b'])
+    assert t.lines(1, 9) == ['a', 'b', '3', '4']
+    t.close()
+
+
+#LINE INDEX
+@pytest.fixture
+def text():
+    try: root = tk.Tk()
+    except tk.TclError: pytest.skip('no display')
+    root.withdraw()
+    yield Textra(root)
+    root.destroy()
+
+def test_check_lines(text):
+    text.text = 'ab\n\tc\nd'
+    assert text.line_lengths(range(1, 4)).tolist() == [2, 2, 1]
+    assert text.dcol(2, 1) == TABS
+    for args in (('insert', '1.1', 'X\nY'), ('delete', '2.0', '3.1'), ('replace', '1.0', '1.end', 'abc'), ('insert', 'end', '\n\n')):
+        text.tk.call(text._w, *args)
+        text.line_lengths(range(1, text.line_count+1))
+        assert text.check_lines() == []
+    assert text.text == 'abc\nc\nd\n\n'